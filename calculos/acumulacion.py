@@ -0,0 +1,108 @@
+# Motor de acumulación de cartera (sin dependencias de interfaz)
+import numpy as np
+import pandas as pd
+from calculos.tasas import PERIODOS_POR_ANIO, convertir_tea_a_periodica
+from calculos.cache import CacheLRU
+
+# Caché compartida entre módulos y sesiones para los resultados de la acumulación
+CACHE_ACUMULACION = CacheLRU(max_entradas=1024, max_bytes=64 * 1024 * 1024)
+
+
+def factor_anualidad(tasa_periodica, total_periodos):
+    """Valor futuro de un aporte de 1 al final de cada período: ((1 + r)^n - 1) / r"""
+    tasa_periodica = np.asarray(tasa_periodica, dtype=float)
+    crecimiento_menos_uno = np.expm1(total_periodos * np.log1p(tasa_periodica))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        factor = crecimiento_menos_uno / tasa_periodica
+    # Con tasa 0 la anualidad es simplemente el número de aportes
+    return np.where(tasa_periodica == 0, total_periodos, factor)[()]
+
+
+def saldo_acumulado(monto_inicial, aporte_periodico, tasa_periodica, total_periodos):
+    """Saldo tras n períodos de capitalización con aporte al final de cada uno (forma cerrada)"""
+    crecimiento = (1 + np.asarray(tasa_periodica, dtype=float)) ** total_periodos
+    return (monto_inicial * crecimiento + aporte_periodico * factor_anualidad(tasa_periodica, total_periodos))[()]
+
+
+def calcular_acumulacion(monto_inicial, aporte_periodico, frecuencia, plazo_anios, tea):
+    """Calcula el capital final y los aportes de la fase de acumulación en O(1)"""
+    num_periodos = PERIODOS_POR_ANIO[frecuencia]
+    total_periodos = plazo_anios * num_periodos
+    tasa_periodica = convertir_tea_a_periodica(tea, frecuencia)
+
+    saldo_final = float(saldo_acumulado(monto_inicial, aporte_periodico, tasa_periodica, total_periodos))
+    aporte_total = monto_inicial + aporte_periodico * total_periodos
+
+    return {
+        'saldo_final': saldo_final,
+        'aporte_total': aporte_total,
+        'ganancia_total': saldo_final - aporte_total,
+        'num_periodos': num_periodos,
+        'total_periodos': total_periodos,
+        'tasa_periodica': tasa_periodica
+    }
+
+
+def cronograma_acumulacion(edad_actual, monto_inicial, aporte_periodico, tasa_periodica,
+                           num_periodos, total_periodos):
+    """Construye el detalle anual de la acumulación de forma vectorizada"""
+    periodos = np.arange(num_periodos, total_periodos + 1, num_periodos)
+    if len(periodos) == 0 or periodos[-1] != total_periodos:
+        periodos = np.append(periodos, total_periodos)
+
+    saldo_inicial = saldo_acumulado(monto_inicial, aporte_periodico, tasa_periodica, periodos - 1)
+    saldo_final = saldo_acumulado(monto_inicial, aporte_periodico, tasa_periodica, periodos)
+
+    df_cartera = pd.DataFrame({
+        'Periodo': np.concatenate(([0], periodos)),
+        'Edad': np.concatenate(([edad_actual], edad_actual + periodos // num_periodos)),
+        'Saldo Inicial': np.concatenate(([monto_inicial], saldo_inicial)),
+        'Intereses': np.concatenate(([0.0], saldo_inicial * tasa_periodica)),
+        'Aporte': np.concatenate(([0.0], np.full(len(periodos), aporte_periodico, dtype=float))),
+        'Saldo Final': np.concatenate(([monto_inicial], saldo_final)),
+        'Aportes Acumulados': np.concatenate(([monto_inicial], monto_inicial + aporte_periodico * periodos))
+    })
+
+    return df_cartera
+
+
+def clave_acumulacion(edad_actual, monto_inicial, aporte_periodico, frecuencia, plazo_anios, tea):
+    """Clave normalizada de una acumulación: los mismos parámetros dan la misma clave en cualquier módulo"""
+    return ('acumulacion', int(edad_actual), round(float(monto_inicial), 2), round(float(aporte_periodico), 2),
+            frecuencia, int(plazo_anios), round(float(tea), 6))
+
+
+def proyeccion_acumulacion(edad_actual, monto_inicial, aporte_periodico, frecuencia, plazo_anios, tea):
+    """Resultado de calcular_acumulacion más su 'cronograma' anual (con caché compartida)
+
+    Devuelve una copia superficial del resultado: `cronograma` es compartido y no debe modificarse.
+    """
+    clave = clave_acumulacion(edad_actual, monto_inicial, aporte_periodico, frecuencia, plazo_anios, tea)
+
+    def calcular():
+        edad, monto, aporte, frec, plazo, tasa = clave[1:]
+        acumulacion = calcular_acumulacion(monto, aporte, frec, plazo, tasa)
+        cronograma = cronograma_acumulacion(
+            edad, monto, aporte, acumulacion['tasa_periodica'],
+            acumulacion['num_periodos'], acumulacion['total_periodos']
+        )
+        return {**acumulacion, 'cronograma': cronograma}
+
+    return dict(CACHE_ACUMULACION.obtener(clave, calcular))
+
+
+def aporte_requerido(objetivo, monto_inicial, tasa_periodica, total_periodos):
+    """Aporte periódico con el que el saldo llega al objetivo (negativo si el monto inicial ya basta)"""
+    crecimiento = (1 + np.asarray(tasa_periodica, dtype=float)) ** total_periodos
+    return ((objetivo - monto_inicial * crecimiento) / factor_anualidad(tasa_periodica, total_periodos))[()]
+
+
+def barrido_acumulacion(monto_inicial, frecuencia, teas, aportes, plazos_anios):
+    """Saldo final para toda la grilla TEA x aporte x plazo (arreglo de 3 dimensiones)
+
+    Los factores de crecimiento solo dependen de la tasa y del plazo, así que se calculan
+    sobre la grilla TEA x plazo y el aporte entra por broadcasting en la última operación.
+    """
+    tasas = convertir_tea_a_periodica(np.asarray(teas, dtype=float), frecuencia)[:, None, None]
+    total_periodos = np.asarray(plazos_anios)[None, None, :] * PERIODOS_POR_ANIO[frecuencia]
+    return saldo_acumulado(monto_inicial, np.asarray(aportes, dtype=float)[None, :, None], tasas, total_periodos)
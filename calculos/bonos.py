@@ -0,0 +1,302 @@
+# Motor de valoración de bonos (sin dependencias de interfaz)
+import numpy as np
+import pandas as pd
+from calculos.tasas import (PERIODOS_POR_ANIO, convertir_tea_a_periodica, periodos_por_anio,
+                            factores_descuento, tabla_descuento)
+from calculos.cache import CacheLRU
+
+# Caché compartida entre reruns y sesiones para las valoraciones de bonos
+CACHE_BONOS = CacheLRU(max_entradas=2048, max_bytes=256 * 1024 * 1024)
+
+
+def flujos_bono(valor_nominal, cupon, total_periodos_bono):
+    """Devuelve los períodos y el vector de flujos (cupones + principal al vencimiento)"""
+    periodos = np.arange(1, total_periodos_bono + 1)
+    flujos = np.full(total_periodos_bono, cupon, dtype=float)
+    flujos[-1] += valor_nominal
+    return periodos, flujos
+
+
+class EstructuraBono:
+    """Flujos de un bono, independientes de la tasa, que se vuelven a descontar para cualquier TEA"""
+
+    def __init__(self, valor_nominal, cupon, total_periodos_bono, frecuencia_bono):
+        self.valor_nominal = valor_nominal
+        self.cupon = cupon
+        self.total_periodos_bono = total_periodos_bono
+        self.frecuencia_bono = frecuencia_bono
+        self.num_periodos_bono = PERIODOS_POR_ANIO[frecuencia_bono]
+
+        self.periodos, self.flujos = flujos_bono(valor_nominal, cupon, total_periodos_bono)
+        self.anios = self.periodos / self.num_periodos_bono
+        self.anios_redondeados = np.round(self.anios, 2)
+
+        # Los arreglos se comparten entre sesiones a través de la caché
+        for arreglo in self._arreglos():
+            arreglo.setflags(write=False)
+
+    def _arreglos(self):
+        return self.periodos, self.flujos, self.anios, self.anios_redondeados
+
+    def __sizeof__(self):
+        return object.__sizeof__(self) + sum(a.nbytes for a in self._arreglos())
+
+    def factores_descuento(self, teas):
+        """Factores (1 + r)^-t para una o varias TEAs (tasas x períodos), desde la tabla compartida"""
+        return tabla_descuento(teas, self.frecuencia_bono, self.total_periodos_bono)
+
+    def valor_presente(self, tea):
+        """Valor presente a una TEA: un producto punto sobre los flujos ya armados"""
+        return float(self.factores_descuento(tea) @ self.flujos)
+
+    def valores_presentes(self, teas, max_elementos=4_000_000):
+        """Valores presentes a un vector de TEAs, en bloques de tasas x períodos"""
+        teas = np.atleast_1d(np.asarray(teas, dtype=float))
+        valores = np.empty(len(teas))
+        filas_bloque = max(1, max_elementos // self.total_periodos_bono)
+        for inicio in range(0, len(teas), filas_bloque):
+            bloque = slice(inicio, inicio + filas_bloque)
+            valores[bloque] = self.factores_descuento(teas[bloque]) @ self.flujos
+        return valores
+
+
+def estructura_bono(valor_nominal, cupon, total_periodos_bono, frecuencia_bono):
+    """Estructura de flujos del bono, armada una sola vez por bono (con caché compartida)"""
+    clave = ('estructura', float(valor_nominal), float(cupon), int(total_periodos_bono), frecuencia_bono)
+    return CACHE_BONOS.obtener(
+        clave, lambda: EstructuraBono(valor_nominal, cupon, total_periodos_bono, frecuencia_bono)
+    )
+
+
+def medidas_riesgo(anios, valores_presentes, valor_presente_total, tea):
+    """Duración, convexidad y DV01 respecto a la TEA a partir de los valores presentes por flujo
+
+    Con t en años y P = sum(VP_t): D_mac = sum(t * VP_t) / P, D_mod = D_mac / (1 + TEA),
+    C = sum(t * (t + 1) * VP_t) / (P * (1 + TEA)^2) y DV01 = D_mod * P * 0.0001.
+    Admite matrices bonos x períodos (se reduce sobre el último eje).
+    """
+    factor = 1 + np.asarray(tea, dtype=float) / 100
+    duracion_macaulay = (anios * valores_presentes).sum(axis=-1) / valor_presente_total
+    duracion_modificada = duracion_macaulay / factor
+    convexidad = (anios * (anios + 1) * valores_presentes).sum(axis=-1) / (valor_presente_total * factor ** 2)
+
+    return {
+        'duracion_macaulay': duracion_macaulay,
+        'duracion_modificada': duracion_modificada,
+        'convexidad': convexidad,
+        'dv01': duracion_modificada * valor_presente_total * 0.0001
+    }
+
+
+def curva_taylor(valor_presente_total, duracion_modificada, convexidad, tea, teas):
+    """Aproximación de la curva precio/tasa por duración y convexidad"""
+    delta = (np.asarray(teas, dtype=float) - tea) / 100
+    return valor_presente_total * (1 - duracion_modificada * delta + 0.5 * convexidad * delta ** 2)
+
+
+def valorar_bono(valor_nominal, tasa_cupon, frecuencia_bono, plazo_bono, tea_bono):
+    """Calcula la valoración del bono (sin caché)"""
+    num_periodos_bono = PERIODOS_POR_ANIO[frecuencia_bono]
+    total_periodos_bono = plazo_bono * num_periodos_bono
+
+    tasa_cupon_periodica = convertir_tea_a_periodica(tasa_cupon, frecuencia_bono)
+    tasa_descuento_periodica = convertir_tea_a_periodica(tea_bono, frecuencia_bono)
+
+    cupon = valor_nominal * tasa_cupon_periodica
+
+    # Los flujos solo dependen de la estructura del bono; aquí solo se descuentan
+    estructura = estructura_bono(valor_nominal, cupon, total_periodos_bono, frecuencia_bono)
+    valores_presentes = estructura.flujos * estructura.factores_descuento(tea_bono)
+    valor_presente_total = float(valores_presentes.sum())
+    riesgo = medidas_riesgo(estructura.anios, valores_presentes, valor_presente_total, tea_bono)
+
+    df_flujos = pd.DataFrame({
+        'Periodo': estructura.periodos,
+        'Año': estructura.anios_redondeados,
+        'Flujo': estructura.flujos,
+        'Valor Presente': valores_presentes
+    })
+
+    return {
+        'df_flujos': df_flujos,
+        'valor_presente_total': valor_presente_total,
+        'cupon': cupon,
+        'tasa_cupon_periodica': tasa_cupon_periodica,
+        'tasa_descuento_periodica': tasa_descuento_periodica,
+        'num_periodos_bono': num_periodos_bono,
+        'total_periodos_bono': total_periodos_bono,
+        **{k: float(v) for k, v in riesgo.items()}
+    }
+
+
+def calcular_valoracion_bono(valor_nominal, tasa_cupon, frecuencia_bono, plazo_bono, tea_bono):
+    """Función para calcular la valoración del bono (con caché compartida)
+
+    Devuelve una copia superficial del resultado: `df_flujos` es compartido y no debe modificarse.
+    """
+    clave = ('valoracion', float(valor_nominal), float(tasa_cupon), frecuencia_bono, int(plazo_bono), float(tea_bono))
+    resultado = CACHE_BONOS.obtener(clave, lambda: valorar_bono(*clave[1:]))
+    return dict(resultado)
+
+
+def curva_precio(valor_nominal, cupon, total_periodos_bono, frecuencia_bono, teas, max_elementos=4_000_000):
+    """Valor presente del bono para un vector de TEAs usando una matriz tasas x períodos"""
+    estructura = estructura_bono(valor_nominal, cupon, total_periodos_bono, frecuencia_bono)
+    return estructura.valores_presentes(teas, max_elementos)
+
+
+def valores_presentes_a_tasas(valor_nominal, cupon, total_periodos_bono, frecuencia_bono, teas):
+    """Valores presentes del bono a varias TEAs (con caché compartida)"""
+    teas = tuple(float(t) for t in teas)
+    clave = ('vp_tasas', float(valor_nominal), float(cupon), int(total_periodos_bono), frecuencia_bono, teas)
+    return CACHE_BONOS.obtener(
+        clave, lambda: curva_precio(valor_nominal, cupon, total_periodos_bono, frecuencia_bono, teas)
+    )
+
+
+def curva_sensibilidad(valor_nominal, cupon, total_periodos_bono, frecuencia_bono,
+                       tasa_min=1.0, tasa_max=20.0, puntos=39):
+    """Curva precio/tasa sobre una grilla uniforme de TEAs (con caché compartida)"""
+    def calcular():
+        tasas = np.linspace(tasa_min, tasa_max, puntos)
+        return tasas, curva_precio(valor_nominal, cupon, total_periodos_bono, frecuencia_bono, tasas)
+
+    clave = ('curva', float(valor_nominal), float(cupon), int(total_periodos_bono), frecuencia_bono,
+             float(tasa_min), float(tasa_max), int(puntos))
+    return CACHE_BONOS.obtener(clave, calcular)
+
+
+def valorar_universo(bonos, max_elementos=4_000_000):
+    """Valora en bloque un universo de bonos (DataFrame, arreglo estructurado o lista de dicts)
+
+    Los bonos se agrupan por número total de períodos y cada grupo se descuenta con una
+    matriz bonos x períodos, partida en bloques de como máximo `max_elementos`.
+    """
+    bonos = pd.DataFrame(bonos)
+
+    valor_nominal = bonos['Valor Nominal'].to_numpy(dtype=float)
+    num_periodos = bonos['Frecuencia'].map(PERIODOS_POR_ANIO).to_numpy(dtype=int)
+    total_periodos = bonos['Años'].to_numpy(dtype=int) * num_periodos
+    rendimiento = bonos['Rendimiento Requerido'].to_numpy(dtype=float)
+
+    tasa_cupon_periodica = convertir_tea_a_periodica(bonos['Tasa Cupón'].to_numpy(dtype=float), num_periodos)
+    tasa_descuento_periodica = convertir_tea_a_periodica(rendimiento, num_periodos)
+    cupon = valor_nominal * tasa_cupon_periodica
+
+    valor_presente = np.empty(len(bonos))
+    riesgo = {k: np.empty(len(bonos)) for k in ('duracion_macaulay', 'duracion_modificada', 'convexidad', 'dv01')}
+    orden = np.argsort(total_periodos, kind='stable')
+    valores_n, inicios = np.unique(total_periodos[orden], return_index=True)
+
+    for n_total, indices in zip(valores_n, np.split(orden, inicios[1:])):
+        periodos = np.arange(1, n_total + 1)
+        filas_bloque = max(1, max_elementos // n_total)
+
+        for inicio in range(0, len(indices), filas_bloque):
+            idx = indices[inicio:inicio + filas_bloque]
+            descuento = factores_descuento(tasa_descuento_periodica[idx], n_total)
+            valores_presentes = cupon[idx, None] * descuento
+            valores_presentes[:, -1] += valor_nominal[idx] * descuento[:, -1]
+            valor_presente[idx] = valores_presentes.sum(axis=1)
+
+            # Riesgo de tasa con la misma matriz de valores presentes
+            anios = periodos / num_periodos[idx, None]
+            for k, v in medidas_riesgo(anios, valores_presentes, valor_presente[idx], rendimiento[idx]).items():
+                riesgo[k][idx] = v
+
+    diferencia = valor_presente - valor_nominal
+
+    return pd.DataFrame({
+        'Cupón': cupon,
+        'Periodos por Año': num_periodos,
+        'Total Periodos': total_periodos,
+        'Tasa Cupón Periódica': tasa_cupon_periodica,
+        'Tasa Descuento Periódica': tasa_descuento_periodica,
+        'Valor Presente': valor_presente,
+        'Diferencia': diferencia,
+        '% sobre VN': (valor_presente / valor_nominal - 1) * 100,
+        'Tipo': np.select([diferencia > 0, diferencia < 0], ['Prima', 'Descuento'], 'Par'),
+        'Duración Macaulay': riesgo['duracion_macaulay'],
+        'Duración Modificada': riesgo['duracion_modificada'],
+        'Convexidad': riesgo['convexidad'],
+        'DV01': riesgo['dv01']
+    }, index=bonos.index)
+
+
+def precio_y_derivada(tasa_periodica, cupon, valor_nominal, total_periodos):
+    """Precio del bono y su derivada dP/dy en forma cerrada (admite arreglos de bonos)
+
+    P = c * a_n + VN * v^n  y  dP/dy = -v * (c * (Ia)_n + n * VN * v^n), con v = 1 / (1 + y)
+    """
+    y = np.asarray(tasa_periodica, dtype=float)
+    v = 1 / (1 + y)
+    v_n = np.exp(-total_periodos * np.log1p(y))
+    casi_cero = np.abs(y) < 1e-9
+    y_seguro = np.where(casi_cero, 1.0, y)
+
+    # Anualidad vencida a_n y anualidad creciente (Ia)_n, con sus límites cuando y -> 0
+    anualidad = np.where(casi_cero, total_periodos, -np.expm1(-total_periodos * np.log1p(y)) / y_seguro)
+    anualidad_creciente = np.where(
+        casi_cero,
+        total_periodos * (total_periodos + 1) / 2,
+        (anualidad * (1 + y) - total_periodos * v_n) / y_seguro
+    )
+
+    precio = cupon * anualidad + valor_nominal * v_n
+    derivada = -v * (cupon * anualidad_creciente + total_periodos * valor_nominal * v_n)
+    return precio, derivada
+
+
+def rendimiento_al_vencimiento(precio, valor_nominal, tasa_cupon, frecuencia_bono, plazo_bono,
+                               tol=1e-10, max_iter=100):
+    """Rendimiento al vencimiento (% TEA) implícito en el precio de mercado, vectorizado
+
+    Newton con derivada analítica sobre todos los bonos aún no convergidos a la vez; si un
+    paso sale del intervalo que encierra la raíz se usa bisección. Precios no positivos y
+    bonos que no convergen en `max_iter` iteraciones devuelven NaN.
+    """
+    num_periodos = periodos_por_anio(frecuencia_bono)
+    precio, valor_nominal, tasa_cupon, plazo_bono, num_periodos = np.broadcast_arrays(
+        np.asarray(precio, dtype=float), np.asarray(valor_nominal, dtype=float),
+        np.asarray(tasa_cupon, dtype=float), np.asarray(plazo_bono), num_periodos
+    )
+    escalar = precio.ndim == 0
+    precio, valor_nominal, tasa_cupon, plazo_bono, num_periodos = (
+        np.atleast_1d(a).astype(float) for a in (precio, valor_nominal, tasa_cupon, plazo_bono, num_periodos)
+    )
+
+    total_periodos = plazo_bono * num_periodos
+    cupon = valor_nominal * convertir_tea_a_periodica(tasa_cupon, num_periodos)
+
+    # Intervalo que encierra la raíz (el precio decrece con la tasa) y aproximación inicial
+    bajo = np.full(precio.shape, -0.99)
+    alto = np.full(precio.shape, 10.0)
+    y = (cupon + (valor_nominal - precio) / total_periodos) / ((valor_nominal + precio) / 2)
+    y = np.clip(y, -0.5, 5.0)
+
+    pendientes = np.flatnonzero(precio > 0)
+    for _ in range(max_iter):
+        if len(pendientes) == 0:
+            break
+        idx = pendientes
+        p, dp = precio_y_derivada(y[idx], cupon[idx], valor_nominal[idx], total_periodos[idx])
+        error = p - precio[idx]
+
+        # Actualizar el intervalo: precio alto => la tasa buscada es mayor
+        bajo[idx] = np.where(error > 0, y[idx], bajo[idx])
+        alto[idx] = np.where(error < 0, y[idx], alto[idx])
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            y_newton = y[idx] - error / dp
+        fuera = ~((y_newton > bajo[idx]) & (y_newton < alto[idx]))
+        y_nuevo = np.where(fuera, (bajo[idx] + alto[idx]) / 2, y_newton)
+
+        convergido = (np.abs(error) <= tol * np.maximum(1.0, precio[idx])) | (np.abs(y_nuevo - y[idx]) < 1e-15)
+        y[idx] = np.where(convergido, y[idx], y_nuevo)
+        pendientes = idx[~convergido]
+
+    # Lo que no convergió en max_iter no es un rendimiento válido
+    y[pendientes] = np.nan
+
+    tea = np.where(precio > 0, ((1 + y) ** num_periodos - 1) * 100, np.nan)
+    return tea[0] if escalar else tea
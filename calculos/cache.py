@@ -0,0 +1,81 @@
+# Caché LRU compartida por todo el proceso (sin dependencias de interfaz)
+import sys
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+
+def tamano_aproximado(valor):
+    """Estima en bytes la memoria que ocupa un resultado cacheado"""
+    if isinstance(valor, pd.DataFrame):
+        return int(valor.memory_usage(index=True, deep=True).sum())
+    if isinstance(valor, np.ndarray):
+        return valor.nbytes
+    if isinstance(valor, dict):
+        return sys.getsizeof(valor) + sum(tamano_aproximado(v) for v in valor.values())
+    if isinstance(valor, (list, tuple)):
+        return sys.getsizeof(valor) + sum(tamano_aproximado(v) for v in valor)
+    return sys.getsizeof(valor)
+
+
+class CacheLRU:
+    """Caché LRU acotada por número de entradas y por memoria, segura entre hilos"""
+
+    def __init__(self, max_entradas=1024, max_bytes=128 * 1024 * 1024):
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self._datos = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+
+    def obtener(self, clave, calcular):
+        """Devuelve el valor cacheado para `clave` o lo calcula con `calcular()` y lo guarda"""
+        with self._lock:
+            if clave in self._datos:
+                self._datos.move_to_end(clave)
+                self.aciertos += 1
+                return self._datos[clave][0]
+            self.fallos += 1
+
+        # El cálculo se hace fuera del lock para no bloquear a otras sesiones
+        valor = calcular()
+        tamano = tamano_aproximado(valor)
+
+        with self._lock:
+            if tamano > self.max_bytes:
+                return valor
+            if clave in self._datos:
+                self._bytes -= self._datos.pop(clave)[1]
+            self._datos[clave] = (valor, tamano)
+            self._bytes += tamano
+
+            while len(self._datos) > self.max_entradas or self._bytes > self.max_bytes:
+                _, (_, tamano_desalojado) = self._datos.popitem(last=False)
+                self._bytes -= tamano_desalojado
+                self.desalojos += 1
+
+        return valor
+
+    def limpiar(self):
+        """Vacía la caché y reinicia las estadísticas"""
+        with self._lock:
+            self._datos.clear()
+            self._bytes = 0
+            self.aciertos = self.fallos = self.desalojos = 0
+
+    def estadisticas(self):
+        """Devuelve aciertos, fallos, desalojos y ocupación actual"""
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                'aciertos': self.aciertos,
+                'fallos': self.fallos,
+                'desalojos': self.desalojos,
+                'tasa_aciertos': self.aciertos / consultas if consultas else 0.0,
+                'entradas': len(self._datos),
+                'bytes': self._bytes
+            }
@@ -0,0 +1,173 @@
+# Agregación de carteras de bonos (sin dependencias de interfaz)
+import numpy as np
+import pandas as pd
+from calculos.bonos import valorar_universo
+
+# Grilla común de la escalera: todas las frecuencias de pago caen en meses enteros
+MESES_POR_ANIO = 12
+
+
+def escalera_flujos(cupon, meses_por_periodo, total_periodos, valor_nominal, cantidades):
+    """Suma los flujos de todas las posiciones en una grilla mensual común
+
+    Para cada frecuencia, el cupón agregado del período k es la suma de los cupones de los
+    bonos con al menos k períodos: un bincount por vencimiento y una suma acumulada inversa.
+    Las amortizaciones se suman directamente en el mes de vencimiento. El costo es
+    O(posiciones + meses), sin recorrer los flujos de cada bono.
+    """
+    vencimiento = total_periodos * meses_por_periodo
+    total_meses = int(vencimiento.max()) if len(vencimiento) else 0
+
+    cupones = np.zeros(total_meses + 1)
+    for paso in np.unique(meses_por_periodo):
+        grupo = meses_por_periodo == paso
+        por_vencimiento = np.bincount(total_periodos[grupo], weights=cupon[grupo] * cantidades[grupo],
+                                      minlength=total_meses // paso + 1)
+        vigentes = np.cumsum(por_vencimiento[::-1])[::-1]
+        cupones[paso::paso] += vigentes[1:]
+
+    amortizacion = np.bincount(vencimiento, weights=valor_nominal * cantidades, minlength=total_meses + 1)
+    return cupones[1:], amortizacion[1:]
+
+
+def agregar_cartera(bonos, cantidades=None):
+    """Valora una cartera de bonos y arma su escalera de flujos agregada
+
+    `bonos` tiene las mismas columnas que valorar_universo; las cantidades se toman de
+    `cantidades` o de la columna 'Cantidad'. Devuelve la escalera mensual, los ingresos por
+    año y el valor presente, la duración y el DV01 de la cartera.
+    """
+    bonos = pd.DataFrame(bonos)
+    if cantidades is None:
+        cantidades = bonos['Cantidad']
+    cantidades = np.asarray(cantidades, dtype=float)
+
+    valoracion = valorar_universo(bonos)
+    num_periodos = valoracion['Periodos por Año'].to_numpy()
+    total_periodos = valoracion['Total Periodos'].to_numpy()
+    valor_nominal = bonos['Valor Nominal'].to_numpy(dtype=float)
+
+    cupones, amortizacion = escalera_flujos(
+        valoracion['Cupón'].to_numpy(), MESES_POR_ANIO // num_periodos, total_periodos,
+        valor_nominal, cantidades
+    )
+    meses = np.arange(1, len(cupones) + 1)
+
+    escalera = pd.DataFrame({
+        'Mes': meses,
+        'Año': (meses - 1) // MESES_POR_ANIO + 1,
+        'Cupones': cupones,
+        'Amortización': amortizacion,
+        'Flujo': cupones + amortizacion
+    })
+    escalera = escalera[escalera['Flujo'] != 0].reset_index(drop=True)
+    ingresos_anuales = escalera.groupby('Año', as_index=False)[['Cupones', 'Amortización', 'Flujo']].sum()
+
+    # Medidas de la cartera ponderadas por el valor presente de cada posición
+    valor_posiciones = cantidades * valoracion['Valor Presente'].to_numpy()
+    valor_presente_total = float(valor_posiciones.sum())
+    pesos = valor_posiciones / valor_presente_total if valor_presente_total else np.zeros_like(valor_posiciones)
+
+    return {
+        'escalera': escalera,
+        'ingresos_anuales': ingresos_anuales,
+        'valoracion': valoracion,
+        'valor_presente_total': valor_presente_total,
+        'valor_nominal_total': float(cantidades @ valor_nominal),
+        'cupon_anual': float(cantidades @ (valoracion['Cupón'].to_numpy() * num_periodos)),
+        'duracion_macaulay': float(pesos @ valoracion['Duración Macaulay'].to_numpy()),
+        'duracion_modificada': float(pesos @ valoracion['Duración Modificada'].to_numpy()),
+        'convexidad': float(pesos @ valoracion['Convexidad'].to_numpy()),
+        'dv01': float(cantidades @ valoracion['DV01'].to_numpy()),
+        'n_posiciones': len(bonos)
+    }
+
+
+def _llenado_voraz(puntaje, tope, presupuesto):
+    """Asigna montos en orden de puntaje hasta agotar el presupuesto (solo puntajes positivos)"""
+    orden = np.argsort(-puntaje, kind='stable')
+    topes = np.where(puntaje[orden] > 0, tope[orden], 0.0)
+    acumulado = np.cumsum(topes)
+    montos = np.empty_like(tope)
+    montos[orden] = np.clip(presupuesto - (acumulado - topes), 0.0, topes)
+    return montos
+
+
+def optimizar_asignacion(bonos, presupuesto, objetivo='rendimiento', concentracion_max=0.4,
+                         duracion_max=None, valoracion=None, iteraciones=60):
+    """Cantidades enteras de cada bono que maximizan el rendimiento o el ingreso por cupones
+
+    Restricciones: presupuesto total, monto máximo por bono (`concentracion_max` del
+    presupuesto) y duración modificada promedio de la cartera <= `duracion_max`.
+    La relajación continua se resuelve con un llenado voraz por valor por unidad monetaria;
+    la restricción de duración entra con un multiplicador de Lagrange que se ajusta por
+    bisección. Luego se redondea hacia abajo y el presupuesto sobrante se completa en
+    orden de puntaje sin violar ninguna restricción.
+    """
+    bonos = pd.DataFrame(bonos)
+    if valoracion is None:
+        valoracion = valorar_universo(bonos)
+
+    precio = valoracion['Valor Presente'].to_numpy(dtype=float)
+    duracion = valoracion['Duración Modificada'].to_numpy(dtype=float)
+    if objetivo == 'cupones':
+        valor = valoracion['Cupón'].to_numpy() * valoracion['Periodos por Año'].to_numpy() / precio
+    else:
+        valor = bonos['Rendimiento Requerido'].to_numpy(dtype=float) / 100
+
+    tope = np.full(len(bonos), concentracion_max * presupuesto)
+    exceso = np.zeros(len(bonos)) if duracion_max is None else duracion - duracion_max
+
+    # Relajación continua: se busca el menor multiplicador que cumple la duración
+    lam = 0.0
+    montos = _llenado_voraz(valor, tope, presupuesto)
+    if montos @ exceso > 0:
+        bajo, alto = 0.0, 1.0
+        while _llenado_voraz(valor - alto * exceso, tope, presupuesto) @ exceso > 0 and alto < 1e12:
+            bajo, alto = alto, alto * 2
+        for _ in range(iteraciones):
+            medio = (bajo + alto) / 2
+            if _llenado_voraz(valor - medio * exceso, tope, presupuesto) @ exceso > 0:
+                bajo = medio
+            else:
+                alto = medio
+        lam = alto
+        montos = _llenado_voraz(valor - lam * exceso, tope, presupuesto)
+
+    # Redondeo entero y llenado del sobrante sin romper presupuesto, topes ni duración
+    cantidades = np.floor(montos / precio + 1e-9)
+    holgura = -(cantidades * precio) @ exceso
+    puntaje = valor - lam * exceso
+    for i in np.argsort(-puntaje, kind='stable'):
+        restante = presupuesto - cantidades @ precio
+        if restante < precio.min():
+            break
+        if puntaje[i] <= 0:
+            continue
+        adicional = np.floor(min(restante, tope[i] - cantidades[i] * precio[i]) / precio[i] + 1e-9)
+        if exceso[i] > 0:
+            adicional = min(adicional, np.floor(holgura / (precio[i] * exceso[i]) + 1e-9))
+        if adicional > 0:
+            cantidades[i] += adicional
+            holgura -= adicional * precio[i] * exceso[i]
+
+    inversion = cantidades * precio
+    inversion_total = float(inversion.sum())
+    pesos = inversion / inversion_total if inversion_total else np.zeros_like(inversion)
+
+    asignacion = pd.DataFrame({
+        'Cantidad': cantidades.astype(int),
+        'Precio': precio,
+        'Inversión': inversion,
+        'Peso': pesos,
+        'Cupón Anual': cantidades * valoracion['Cupón'].to_numpy() * valoracion['Periodos por Año'].to_numpy()
+    }, index=bonos.index)
+
+    return {
+        'asignacion': asignacion,
+        'inversion_total': inversion_total,
+        'remanente': float(presupuesto - inversion_total),
+        'rendimiento_promedio': float(pesos @ bonos['Rendimiento Requerido'].to_numpy(dtype=float)),
+        'cupon_anual': float(asignacion['Cupón Anual'].sum()),
+        'duracion_modificada': float(pesos @ duracion)
+    }
@@ -0,0 +1,130 @@
+# Exportación de resultados a CSV, Parquet y Arrow IPC (sin dependencias de interfaz)
+import io
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from openpyxl import Workbook
+
+FORMATOS_EXPORTACION = {
+    'CSV': {'extension': 'csv', 'mime': 'text/csv'},
+    'Parquet': {'extension': 'parquet', 'mime': 'application/vnd.apache.parquet'},
+    'Arrow IPC': {'extension': 'arrow', 'mime': 'application/vnd.apache.arrow.file'},
+    'Excel': {'extension': 'xlsx', 'mime': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'}
+}
+
+# Códecs disponibles por formato (None = sin compresión)
+COMPRESIONES = {
+    'CSV': [None],
+    'Parquet': [None, 'snappy', 'zstd', 'gzip'],
+    'Arrow IPC': [None, 'lz4', 'zstd'],
+    'Excel': [None]
+}
+
+# Filas que se serializan a la vez en las exportaciones por bloques
+FILAS_POR_BLOQUE = 50_000
+
+
+def bloques_de(df, filas_por_bloque=FILAS_POR_BLOQUE):
+    """Recorre un DataFrame en bloques de filas"""
+    for inicio in range(0, len(df), filas_por_bloque):
+        yield df.iloc[inicio:inicio + filas_por_bloque]
+
+
+def _como_bloques(datos):
+    return bloques_de(datos) if isinstance(datos, pd.DataFrame) else datos
+
+
+def escribir_csv(datos, destino):
+    """Escribe un CSV en `destino` (archivo binario abierto) bloque a bloque
+
+    `datos` es un DataFrame o un generador de DataFrames con las mismas columnas; solo un
+    bloque está serializado en memoria a la vez.
+    """
+    encabezado = True
+    for bloque in _como_bloques(datos):
+        bloque.to_csv(destino, index=False, header=encabezado, encoding='utf-8')
+        encabezado = False
+
+
+def escribir_xlsx(hojas, destino):
+    """Escribe un libro Excel en modo write-only con una hoja por resultado
+
+    `hojas` asocia el nombre de cada hoja a un DataFrame o a un generador de bloques. Las
+    filas se vuelcan a medida que llegan, así que la memoria no crece con el total de filas.
+    """
+    libro = Workbook(write_only=True)
+    for nombre, datos in hojas.items():
+        hoja = libro.create_sheet(title=nombre[:31])
+        encabezado = True
+        for bloque in _como_bloques(datos):
+            if encabezado:
+                hoja.append(list(bloque.columns))
+                encabezado = False
+            for fila in zip(*(bloque[columna].tolist() for columna in bloque.columns)):
+                hoja.append(fila)
+    libro.save(destino)
+
+
+def exportar_tabla(df, formato='Parquet', compresion=None, nombre_hoja='Datos'):
+    """Serializa un DataFrame en el formato indicado y devuelve los bytes
+
+    Parquet y Arrow IPC conservan los tipos de cada columna (float64, int64, texto), así
+    que el archivo se carga sin volver a interpretar texto. CSV y Excel se escriben por
+    bloques de filas.
+    """
+    if formato in ('CSV', 'Excel'):
+        buffer = io.BytesIO()
+        if formato == 'CSV':
+            escribir_csv(df, buffer)
+        else:
+            escribir_xlsx({nombre_hoja: df}, buffer)
+        return buffer.getvalue()
+    if formato not in FORMATOS_EXPORTACION:
+        raise ValueError(f"Formato de exportación no soportado: {formato}")
+
+    tabla = pa.Table.from_pandas(df, preserve_index=False)
+    buffer = pa.BufferOutputStream()
+
+    if formato == 'Parquet':
+        pq.write_table(tabla, buffer, compression=compresion or 'none')
+    else:
+        opciones = pa.ipc.IpcWriteOptions(compression=compresion)
+        with pa.ipc.new_file(buffer, tabla.schema, options=opciones) as escritor:
+            escritor.write_table(tabla)
+
+    return buffer.getvalue().to_pybytes()
+
+
+def formato_de_ruta(ruta):
+    """Formato de exportación que corresponde a la extensión del archivo"""
+    extension = str(ruta).rsplit('.', 1)[-1].lower()
+    for formato, datos in FORMATOS_EXPORTACION.items():
+        if datos['extension'] == extension or (formato == 'Arrow IPC' and extension in ('feather', 'ipc')):
+            return formato
+    raise ValueError(f"Extensión de archivo no soportada: .{extension}")
+
+
+def leer_tabla(ruta):
+    """Lee un DataFrame desde CSV, Parquet, Arrow IPC o Excel según la extensión"""
+    formato = formato_de_ruta(ruta)
+    if formato == 'CSV':
+        return pd.read_csv(ruta)
+    if formato == 'Parquet':
+        return pq.read_table(ruta).to_pandas()
+    if formato == 'Arrow IPC':
+        with pa.memory_map(str(ruta)) as fuente:
+            return pa.ipc.open_file(fuente).read_all().to_pandas()
+    return pd.read_excel(ruta)
+
+
+def guardar_tabla(df, ruta, compresion=None):
+    """Guarda un DataFrame en el formato que indica la extensión de `ruta`"""
+    formato = formato_de_ruta(ruta)
+    if formato == 'Excel':
+        escribir_xlsx({'Resultados': df}, ruta)
+        return
+    with open(ruta, 'wb') as destino:
+        if formato == 'CSV':
+            escribir_csv(df, destino)
+        else:
+            destino.write(exportar_tabla(df, formato, compresion))
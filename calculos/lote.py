@@ -0,0 +1,75 @@
+# Proyección de retiro para carteras completas de clientes (sin dependencias de interfaz)
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from calculos.acumulacion import saldo_acumulado
+from calculos.retiro import obtener_tasa_impuesto, calcular_pension_mensual
+from calculos.tasas import convertir_tea_a_periodica, periodos_por_anio
+
+COLUMNAS_ENTRADA = [
+    'Edad Actual', 'Monto Inicial', 'Aporte Periódico', 'Frecuencia', 'Plazo (Años)',
+    'TEA Acumulación (%)', 'Tipo de Impuesto', 'Tipo de Retiro', 'TEA Retiro (%)', 'Años de Retiro'
+]
+
+# Por debajo de este número de clientes el costo de enviar los lotes a otros procesos supera al cálculo
+MIN_FILAS_PARALELO = 1_000_000
+
+
+def proyectar_clientes(clientes):
+    """Capital, impuesto, capital neto y pensión de cada cliente en operaciones vectoriales
+
+    Mismo cálculo que el Módulo B fila por fila. Para 'Retiro Total' la pensión es 0 y las
+    columnas de retiro pueden venir vacías.
+    """
+    faltantes = [c for c in COLUMNAS_ENTRADA if c not in clientes.columns]
+    if faltantes:
+        raise ValueError(f"Faltan columnas en el archivo de clientes: {', '.join(faltantes)}")
+
+    num_periodos = periodos_por_anio(clientes['Frecuencia'].to_numpy())
+    plazo_anios = clientes['Plazo (Años)'].to_numpy(dtype=int)
+    total_periodos = plazo_anios * num_periodos
+    monto_inicial = clientes['Monto Inicial'].to_numpy(dtype=float)
+    aporte_periodico = clientes['Aporte Periódico'].to_numpy(dtype=float)
+    tasa_periodica = convertir_tea_a_periodica(clientes['TEA Acumulación (%)'].to_numpy(dtype=float), num_periodos)
+
+    capital = saldo_acumulado(monto_inicial, aporte_periodico, tasa_periodica, total_periodos)
+    aporte_total = monto_inicial + aporte_periodico * total_periodos
+    ganancia = capital - aporte_total
+    tasa_impuesto = obtener_tasa_impuesto(clientes['Tipo de Impuesto'].to_numpy())
+    impuesto = ganancia * tasa_impuesto
+    capital_neto = capital - impuesto
+
+    pension = clientes['Tipo de Retiro'].to_numpy() == 'Pensión Mensual'
+    tea_retiro = np.where(pension, clientes['TEA Retiro (%)'].to_numpy(dtype=float), 0.0)
+    anios_retiro = np.where(pension, clientes['Años de Retiro'].to_numpy(dtype=float), 1.0)
+    pension_mensual = np.where(pension, calcular_pension_mensual(capital_neto, tea_retiro, anios_retiro), 0.0)
+
+    return clientes.assign(**{
+        'Edad de Retiro': clientes['Edad Actual'].to_numpy() + plazo_anios,
+        'Capital Acumulado': capital,
+        'Aporte Total': aporte_total,
+        'Ganancia': ganancia,
+        'Tasa Impuesto': tasa_impuesto,
+        'Impuesto': impuesto,
+        'Capital Neto': capital_neto,
+        'Pensión Mensual': pension_mensual
+    })
+
+
+def proyectar_en_paralelo(clientes, procesos=1, filas_por_lote=100_000):
+    """proyectar_clientes repartido en lotes de filas entre varios procesos
+
+    El cálculo vectorizado es más rápido que enviar los lotes a otros procesos, así que solo
+    se reparte si se piden varios procesos y hay al menos MIN_FILAS_PARALELO clientes.
+    """
+    if not procesos or procesos <= 1 or len(clientes) < MIN_FILAS_PARALELO:
+        return proyectar_clientes(clientes), 1
+
+    lotes = [clientes.iloc[i:i + filas_por_lote] for i in range(0, len(clientes), filas_por_lote)]
+    procesos = min(procesos, len(lotes))
+    if procesos == 1:
+        return proyectar_clientes(clientes), procesos
+
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        resultados = list(pool.map(proyectar_clientes, lotes))
+    return pd.concat(resultados), procesos
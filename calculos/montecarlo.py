@@ -0,0 +1,181 @@
+# Simulación Monte Carlo de carteras (sin dependencias de interfaz)
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from calculos.cache import CacheLRU
+from calculos.tasas import PERIODOS_POR_ANIO, convertir_tea_a_periodica
+
+# Resúmenes de simulaciones ya corridas, por parámetros
+CACHE_SIMULACIONES = CacheLRU(max_entradas=32, max_bytes=256 * 1024 * 1024)
+
+# Margen relativo sobre el capital neto antes de marcar una trayectoria como agotada
+TOLERANCIA_RUINA = 1e-9
+
+# Los trabajadores no se crean con fork: el servidor de Streamlit tiene varios hilos y
+# bifurcar un proceso con hilos puede dejar locks tomados en el hijo
+METODO_INICIO = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+
+def generar_retornos(rng, n_trayectorias, total_periodos, tea, volatilidad, frecuencia,
+                     metodo='lognormal', retornos_historicos=None):
+    """Genera retornos periódicos simulados como matriz trayectorias x períodos
+
+    - 'lognormal': retornos lognormales con media igual a la tasa periódica de la TEA y
+      volatilidad anual `volatilidad` (%) escalada a la frecuencia.
+    - 'bootstrap': remuestreo con reemplazo de `retornos_historicos` (retornos periódicos).
+    """
+    if metodo == 'bootstrap':
+        historicos = np.asarray(retornos_historicos, dtype=float)
+        return historicos[rng.integers(0, len(historicos), size=(n_trayectorias, total_periodos))]
+
+    tasa_periodica = convertir_tea_a_periodica(tea, frecuencia)
+    sigma = volatilidad / 100 / np.sqrt(PERIODOS_POR_ANIO[frecuencia])
+    mu = np.log1p(tasa_periodica) - sigma ** 2 / 2
+    return np.expm1(rng.normal(mu, sigma, size=(n_trayectorias, total_periodos)))
+
+
+def simular_cartera(monto_inicial, aporte_periodico, frecuencia, plazo_anios, tea, volatilidad,
+                    n_trayectorias=100_000, semilla=None, metodo='lognormal', retornos_historicos=None,
+                    max_elementos=2_000_000):
+    """Simula el saldo de la cartera y devuelve los saldos anuales (trayectorias x años + 1)
+
+    Las trayectorias se procesan en bloques de como máximo `max_elementos` valores, y el
+    saldo de cada bloque se obtiene sin bucle por período:
+    S_t = G_t * (S_0 + A * sum(1 / G_k, k <= t)), con G_t el crecimiento acumulado.
+    """
+    num_periodos = PERIODOS_POR_ANIO[frecuencia]
+    total_periodos = plazo_anios * num_periodos
+    rng = np.random.default_rng(semilla)
+
+    saldos = np.empty((n_trayectorias, plazo_anios + 1))
+    saldos[:, 0] = monto_inicial
+
+    filas_bloque = max(1, max_elementos // total_periodos)
+    for inicio in range(0, n_trayectorias, filas_bloque):
+        filas = min(filas_bloque, n_trayectorias - inicio)
+        retornos = generar_retornos(rng, filas, total_periodos, tea, volatilidad, frecuencia,
+                                    metodo, retornos_historicos)
+
+        crecimiento = np.cumprod(1 + retornos, axis=1)
+        saldo = crecimiento * (monto_inicial + aporte_periodico * np.cumsum(1 / crecimiento, axis=1))
+        saldos[inicio:inicio + filas, 1:] = saldo[:, num_periodos - 1::num_periodos]
+
+    return saldos
+
+
+def resumir_simulacion(saldos, percentiles=(5, 50, 95)):
+    """Resume la simulación en percentiles anuales y saldos finales ordenados"""
+    return {
+        'percentiles': dict(zip(percentiles, np.percentile(saldos, percentiles, axis=0))),
+        'saldos_finales': np.sort(saldos[:, -1]),
+        'n_trayectorias': len(saldos)
+    }
+
+
+def probabilidad_objetivo(saldos_finales_ordenados, objetivo):
+    """Probabilidad de que el saldo final alcance o supere el objetivo"""
+    n = len(saldos_finales_ordenados)
+    return (n - np.searchsorted(saldos_finales_ordenados, objetivo, side='left')) / n
+
+
+def proyeccion_estocastica(monto_inicial, aporte_periodico, frecuencia, plazo_anios, tea, volatilidad,
+                           n_trayectorias=100_000, semilla=42):
+    """Simulación lognormal resumida (con caché compartida)"""
+    clave = (float(monto_inicial), float(aporte_periodico), frecuencia, int(plazo_anios), float(tea),
+             float(volatilidad), int(n_trayectorias), semilla)
+    return CACHE_SIMULACIONES.obtener(clave, lambda: resumir_simulacion(
+        simular_cartera(monto_inicial, aporte_periodico, frecuencia, plazo_anios, tea, volatilidad,
+                        n_trayectorias, semilla)
+    ))
+
+
+def _simular_ruina_lote(parametros, semilla, n_trayectorias, max_elementos=2_000_000):
+    """Simula un lote de trayectorias de acumulación + retiro (se ejecuta en un proceso del pool)"""
+    rng = np.random.default_rng(semilla)
+    frecuencia = parametros['frecuencia']
+    total_periodos = parametros['plazo_anios'] * PERIODOS_POR_ANIO[frecuencia]
+    meses_retiro = parametros['anios_retiro'] * 12
+    aportes_totales = parametros['monto_inicial'] + parametros['aporte_periodico'] * total_periodos
+
+    meses_agotamiento = np.zeros(n_trayectorias, dtype=np.int32)
+    capital_neto = np.empty(n_trayectorias)
+
+    filas_bloque = max(1, max_elementos // max(total_periodos, meses_retiro))
+    for inicio in range(0, n_trayectorias, filas_bloque):
+        filas = min(filas_bloque, n_trayectorias - inicio)
+        bloque = slice(inicio, inicio + filas)
+
+        # Acumulación: saldo final de cada trayectoria e impuesto sobre la ganancia positiva
+        retornos = generar_retornos(rng, filas, total_periodos, parametros['tea_acumulacion'],
+                                    parametros['volatilidad'], frecuencia)
+        crecimiento = np.cumprod(1 + retornos, axis=1)
+        capital = crecimiento[:, -1] * (parametros['monto_inicial']
+                                        + parametros['aporte_periodico'] * np.sum(1 / crecimiento, axis=1))
+        capital_neto[bloque] = capital - np.maximum(capital - aportes_totales, 0) * parametros['tasa_impuesto']
+
+        # Retiro: el saldo se agota cuando el valor presente de los retiros supera el capital neto
+        # (con tolerancia relativa: pagar exactamente la última pensión no es agotamiento)
+        retornos = generar_retornos(rng, filas, meses_retiro, parametros['tea_retiro'],
+                                    parametros['volatilidad_retiro'], 'Mensual')
+        crecimiento = np.cumprod(1 + retornos, axis=1)
+        agotado = (parametros['pension_mensual'] * np.cumsum(1 / crecimiento, axis=1)
+                   > capital_neto[bloque, None] * (1 + TOLERANCIA_RUINA))
+        meses_agotamiento[bloque] = np.where(agotado.any(axis=1), agotado.argmax(axis=1) + 1, 0)
+
+    return meses_agotamiento, capital_neto
+
+
+def simular_ruina(monto_inicial, aporte_periodico, frecuencia, plazo_anios, tea_acumulacion,
+                  tasa_impuesto, tea_retiro, anios_retiro, pension_mensual, volatilidad,
+                  volatilidad_retiro=None, n_trayectorias=100_000, semilla=42, procesos=None,
+                  trayectorias_por_lote=50_000):
+    """Probabilidad de agotar el capital durante el retiro con retornos aleatorios
+
+    Las trayectorias se reparten en lotes de tamaño fijo con semillas derivadas de `semilla`
+    (el resultado no depende del número de procesos) y los lotes se ejecutan en un pool de
+    procesos. Devuelve el mes de agotamiento de cada trayectoria (0 = nunca se agota).
+    """
+    parametros = {
+        'monto_inicial': float(monto_inicial),
+        'aporte_periodico': float(aporte_periodico),
+        'frecuencia': frecuencia,
+        'plazo_anios': int(plazo_anios),
+        'tea_acumulacion': float(tea_acumulacion),
+        'tasa_impuesto': float(tasa_impuesto),
+        'tea_retiro': float(tea_retiro),
+        'anios_retiro': int(anios_retiro),
+        'pension_mensual': float(pension_mensual),
+        'volatilidad': float(volatilidad),
+        'volatilidad_retiro': float(volatilidad if volatilidad_retiro is None else volatilidad_retiro)
+    }
+
+    tamanos = [min(trayectorias_por_lote, n_trayectorias - i) for i in range(0, n_trayectorias, trayectorias_por_lote)]
+    semillas = np.random.SeedSequence(semilla).spawn(len(tamanos))
+    procesos = min(procesos or os.cpu_count() or 1, len(tamanos))
+
+    if procesos == 1:
+        lotes = [_simular_ruina_lote(parametros, s, n) for s, n in zip(semillas, tamanos)]
+    else:
+        contexto = multiprocessing.get_context(METODO_INICIO)
+        with ProcessPoolExecutor(max_workers=procesos, mp_context=contexto) as pool:
+            lotes = list(pool.map(_simular_ruina_lote, [parametros] * len(tamanos), semillas, tamanos))
+
+    meses_agotamiento = np.concatenate([m for m, _ in lotes])
+    capital_neto = np.concatenate([c for _, c in lotes])
+    agotadas = meses_agotamiento > 0
+
+    return {
+        'prob_ruina': float(agotadas.mean()),
+        'meses_agotamiento': meses_agotamiento,
+        'anios_agotamiento': (meses_agotamiento[agotadas] - 1) // 12,
+        'capital_neto_percentiles': dict(zip((5, 50, 95), np.percentile(capital_neto, (5, 50, 95)))),
+        'n_trayectorias': n_trayectorias,
+        'procesos': procesos
+    }
+
+
+def analisis_ruina(*args, **kwargs):
+    """simular_ruina con caché compartida por parámetros (el número de procesos no altera el resultado)"""
+    clave = ('ruina',) + tuple(args) + tuple(sorted((k, v) for k, v in kwargs.items() if k != 'procesos'))
+    return CACHE_SIMULACIONES.obtener(clave, lambda: simular_ruina(*args, **kwargs))
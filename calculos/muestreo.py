@@ -0,0 +1,62 @@
+# Reducción de series largas antes de graficarlas (sin dependencias de interfaz)
+import numpy as np
+
+
+def indices_lttb(x, y, max_puntos):
+    """Índices de la serie elegidos con Largest-Triangle-Three-Buckets
+
+    Conserva el primer y el último punto; el resto de la serie se reparte en
+    `max_puntos - 2` cubetas y de cada una se toma el punto que forma el triángulo de mayor
+    área con el punto elegido antes y el promedio de la cubeta siguiente.
+    """
+    n = len(x)
+    if max_puntos >= n or max_puntos < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    cubetas = max_puntos - 2
+    bordes = np.linspace(1, n - 1, cubetas + 1).astype(int)
+
+    # Promedio de la cubeta siguiente a cada cubeta (la última mira al punto final)
+    suma_x = np.concatenate(([0.0], np.cumsum(x)))
+    suma_y = np.concatenate(([0.0], np.cumsum(y)))
+    tamanos = np.diff(bordes)
+    media_x = np.append((suma_x[bordes[2:]] - suma_x[bordes[1:-1]]) / tamanos[1:], x[-1])
+    media_y = np.append((suma_y[bordes[2:]] - suma_y[bordes[1:-1]]) / tamanos[1:], y[-1])
+
+    indices = np.empty(max_puntos, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    anterior = 0
+    for i in range(cubetas):
+        inicio, fin = bordes[i], bordes[i + 1]
+        area = np.abs((x[anterior] - media_x[i]) * (y[inicio:fin] - y[anterior])
+                      - (x[anterior] - x[inicio:fin]) * (media_y[i] - y[anterior]))
+        anterior = inicio + int(area.argmax())
+        indices[i + 1] = anterior
+
+    return indices
+
+
+def indices_min_max(y, max_puntos):
+    """Índices del mínimo y del máximo de cada cubeta (conserva los picos de la serie)"""
+    n = len(y)
+    if max_puntos >= n or max_puntos < 4:
+        return np.arange(n)
+
+    cubetas = max_puntos // 2 - 1
+    cubeta = np.repeat(np.arange(cubetas), np.diff(np.linspace(0, n, cubetas + 1).astype(int)))
+    orden = np.lexsort((np.asarray(y), cubeta))
+    inicios = np.searchsorted(cubeta[orden], np.arange(cubetas))
+    finales = np.append(inicios[1:], n) - 1
+
+    return np.unique(np.concatenate(([0, n - 1], orden[inicios], orden[finales])))
+
+
+def reducir_serie(x, *ys, max_puntos=2000, metodo='lttb'):
+    """Reduce x y las series ys a lo sumo a `max_puntos` (los índices se eligen con la última serie)"""
+    if metodo == 'min_max':
+        indices = indices_min_max(ys[-1], max_puntos)
+    else:
+        indices = indices_lttb(x, ys[-1], max_puntos)
+    return (np.asarray(x)[indices],) + tuple(np.asarray(y)[indices] for y in ys)
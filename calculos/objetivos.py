@@ -0,0 +1,146 @@
+# Metas de retiro: qué aporte, tasa, monto inicial o edad de retiro alcanzan una pensión neta
+# objetivo (sin dependencias de interfaz). Todas las funciones aceptan escalares o arreglos,
+# así que un lote de clientes se resuelve en una sola llamada.
+import numpy as np
+import pandas as pd
+from calculos.acumulacion import factor_anualidad
+from calculos.retiro import calcular_pension_mensual
+from calculos.tasas import convertir_tea_a_periodica, periodos_por_anio
+
+INCOGNITAS = {
+    'aporte': 'Aporte Periódico',
+    'tea': 'TEA Acumulación (%)',
+    'monto_inicial': 'Monto Inicial',
+    'edad_retiro': 'Edad de Retiro'
+}
+
+
+def capital_neto_objetivo(pension_objetivo, tea_retiro, anios_retiro):
+    """Capital neto que financia la pensión mensual objetivo (inversa de la anualidad)"""
+    return pension_objetivo / calcular_pension_mensual(1.0, tea_retiro, anios_retiro)
+
+
+def _coeficientes(num_periodos, plazo_anios, tea, tasa_impuesto):
+    """Capital neto = monto_inicial * coef_monto + aporte * coef_aporte (lineal en ambos)
+
+    Con saldo S = M * G + A * F y el impuesto sobre la ganancia S - (M + A * n):
+    neto = (1 - t) * S + t * (M + A * n).
+    """
+    total_periodos = np.asarray(plazo_anios) * num_periodos
+    tasa_periodica = convertir_tea_a_periodica(tea, num_periodos, en_cache=False)
+
+    crecimiento = (1 + tasa_periodica) ** total_periodos
+    coef_monto = (1 - tasa_impuesto) * crecimiento + tasa_impuesto
+    coef_aporte = (1 - tasa_impuesto) * factor_anualidad(tasa_periodica, total_periodos) + tasa_impuesto * total_periodos
+    return coef_monto, coef_aporte
+
+
+def _capital_neto(monto_inicial, aporte_periodico, num_periodos, plazo_anios, tea, tasa_impuesto):
+    coef_monto, coef_aporte = _coeficientes(num_periodos, plazo_anios, tea, tasa_impuesto)
+    return monto_inicial * coef_monto + aporte_periodico * coef_aporte
+
+
+def capital_neto_final(monto_inicial, aporte_periodico, frecuencia, plazo_anios, tea, tasa_impuesto):
+    """Capital neto después de impuestos al terminar la acumulación"""
+    return _capital_neto(monto_inicial, aporte_periodico, periodos_por_anio(frecuencia), plazo_anios, tea,
+                         tasa_impuesto)[()]
+
+
+def resolver_aporte(capital_objetivo, monto_inicial, frecuencia, plazo_anios, tea, tasa_impuesto):
+    """Aporte periódico que alcanza el capital neto objetivo (0 si el monto inicial ya basta)"""
+    coef_monto, coef_aporte = _coeficientes(periodos_por_anio(frecuencia), plazo_anios, tea, tasa_impuesto)
+    return np.maximum((capital_objetivo - monto_inicial * coef_monto) / coef_aporte, 0.0)[()]
+
+
+def resolver_monto_inicial(capital_objetivo, aporte_periodico, frecuencia, plazo_anios, tea, tasa_impuesto):
+    """Monto inicial que alcanza el capital neto objetivo (0 si los aportes ya bastan)"""
+    coef_monto, coef_aporte = _coeficientes(periodos_por_anio(frecuencia), plazo_anios, tea, tasa_impuesto)
+    return np.maximum((capital_objetivo - aporte_periodico * coef_aporte) / coef_monto, 0.0)[()]
+
+
+def resolver_tea(capital_objetivo, monto_inicial, aporte_periodico, frecuencia, plazo_anios, tasa_impuesto,
+                 tea_max=100.0, iteraciones=60):
+    """TEA de acumulación que alcanza el capital neto objetivo, por bisección vectorizada
+
+    El capital neto crece con la tasa, así que cada cliente tiene una sola raíz en
+    [0, tea_max]. Devuelve 0 si el objetivo se alcanza sin rentabilidad y NaN si ni con
+    `tea_max` se llega.
+    """
+    forma = np.broadcast(capital_objetivo, monto_inicial, aporte_periodico, plazo_anios, tasa_impuesto).shape
+    bajo = np.zeros(forma)
+    alto = np.full(forma, tea_max)
+
+    num_periodos = periodos_por_anio(frecuencia)
+
+    def falta(tea):
+        return _capital_neto(monto_inicial, aporte_periodico, num_periodos, plazo_anios, tea,
+                             tasa_impuesto) < capital_objetivo
+
+    for _ in range(iteraciones):
+        medio = (bajo + alto) / 2
+        sube = falta(medio)
+        bajo = np.where(sube, medio, bajo)
+        alto = np.where(sube, alto, medio)
+
+    tea = np.where(falta(0.0), alto, 0.0)
+    return np.where(falta(tea_max), np.nan, tea)[()]
+
+
+def resolver_edad_retiro(capital_objetivo, edad_actual, monto_inicial, aporte_periodico, frecuencia, tea,
+                         tasa_impuesto, plazo_max=80):
+    """Primera edad (en años enteros) en la que el capital neto alcanza el objetivo
+
+    Búsqueda binaria vectorizada sobre el plazo, válida con TEA >= 0 (el capital neto crece
+    con el plazo). Devuelve NaN si no se alcanza dentro de `plazo_max` años.
+    """
+    forma = np.broadcast(capital_objetivo, edad_actual, monto_inicial, aporte_periodico, tea, tasa_impuesto).shape
+    bajo = np.zeros(forma, dtype=int)
+    alto = np.full(forma, plazo_max, dtype=int)
+
+    num_periodos = periodos_por_anio(frecuencia)
+
+    def alcanza(plazo):
+        return _capital_neto(monto_inicial, aporte_periodico, num_periodos, plazo, tea,
+                             tasa_impuesto) >= capital_objetivo
+
+    while np.any(alto - bajo > 1):
+        medio = (bajo + alto) // 2
+        llega = alcanza(medio)
+        alto = np.where(llega, medio, alto)
+        bajo = np.where(llega, bajo, medio)
+
+    plazo = np.where(alcanza(0), 0, alto)
+    return np.where(alcanza(plazo_max), edad_actual + plazo, np.nan)[()]
+
+
+def resolver_meta(clientes, incognita):
+    """Resuelve la incógnita para un lote de clientes (DataFrame) con pensión neta objetivo
+
+    Columnas: 'Edad Actual', 'Monto Inicial', 'Aporte Periódico', 'Frecuencia',
+    'Plazo (Años)', 'TEA Acumulación (%)', 'Tasa Impuesto', 'TEA Retiro (%)',
+    'Años de Retiro' y 'Pensión Objetivo'. La columna de la incógnita se ignora.
+    """
+    c = {k: clientes[k].to_numpy() for k in clientes.columns}
+    objetivo = capital_neto_objetivo(c['Pensión Objetivo'].astype(float), c['TEA Retiro (%)'].astype(float),
+                                     c['Años de Retiro'])
+    frecuencia = c['Frecuencia']
+
+    if incognita == 'aporte':
+        valores = resolver_aporte(objetivo, c['Monto Inicial'], frecuencia, c['Plazo (Años)'],
+                                  c['TEA Acumulación (%)'], c['Tasa Impuesto'])
+    elif incognita == 'monto_inicial':
+        valores = resolver_monto_inicial(objetivo, c['Aporte Periódico'], frecuencia, c['Plazo (Años)'],
+                                         c['TEA Acumulación (%)'], c['Tasa Impuesto'])
+    elif incognita == 'tea':
+        valores = resolver_tea(objetivo, c['Monto Inicial'], c['Aporte Periódico'], frecuencia,
+                               c['Plazo (Años)'], c['Tasa Impuesto'])
+    elif incognita == 'edad_retiro':
+        valores = resolver_edad_retiro(objetivo, c['Edad Actual'], c['Monto Inicial'], c['Aporte Periódico'],
+                                       frecuencia, c['TEA Acumulación (%)'], c['Tasa Impuesto'])
+    else:
+        raise ValueError(f"Incógnita no soportada: {incognita}")
+
+    return pd.DataFrame({
+        'Capital Neto Objetivo': objetivo,
+        INCOGNITAS[incognita]: valores
+    }, index=clientes.index)
@@ -0,0 +1,48 @@
+# Fase de retiro: impuestos y pensión (sin dependencias de interfaz)
+import numpy as np
+from calculos.acumulacion import calcular_acumulacion
+from calculos.tasas import convertir_tea_a_periodica
+
+
+def obtener_tasa_impuesto(tipo_impuesto):
+    """Devuelve la tasa de impuesto a la ganancia según el origen de las inversiones"""
+    if isinstance(tipo_impuesto, str):
+        return 0.295 if 'Extranjera' in tipo_impuesto else 0.05
+    return np.where(np.char.find(np.asarray(tipo_impuesto, dtype=str), 'Extranjera') >= 0, 0.295, 0.05)
+
+
+def aplicar_impuesto(capital, ganancia, tasa_impuesto):
+    """Devuelve el impuesto sobre la ganancia y el capital neto resultante"""
+    impuesto = ganancia * tasa_impuesto
+    return impuesto, capital - impuesto
+
+
+def calcular_pension_mensual(capital_neto, tea_retiro, anios_retiro):
+    """Pensión mensual por anualidad: PMT = PV * r / (1 - (1 + r)^-n)"""
+    # Las TEAs de retiro son datos de clientes, no una tabla que se vuelva a consultar
+    tasa_mensual = np.asarray(convertir_tea_a_periodica(tea_retiro, 'Mensual', en_cache=False), dtype=float)
+    meses_retiro = np.asarray(anios_retiro) * 12
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pension = capital_neto * tasa_mensual / -np.expm1(-meses_retiro * np.log1p(tasa_mensual))
+    # Con tasa 0 el capital simplemente se reparte entre los meses
+    return np.where(tasa_mensual == 0, capital_neto / meses_retiro, pension)[()]
+
+
+def proyectar_retiro(monto_inicial, aporte_periodico, frecuencia, plazo_anios, tea_cartera,
+                     tasa_impuesto, tea_retiro=None, anios_retiro=None):
+    """Acumulación, impuesto y (opcionalmente) pensión mensual de un cliente"""
+    acumulacion = calcular_acumulacion(monto_inicial, aporte_periodico, frecuencia, plazo_anios, tea_cartera)
+    impuesto, capital_neto = aplicar_impuesto(
+        acumulacion['saldo_final'], acumulacion['ganancia_total'], tasa_impuesto
+    )
+
+    pension = 0.0
+    if tea_retiro is not None and anios_retiro is not None:
+        pension = float(calcular_pension_mensual(capital_neto, tea_retiro, anios_retiro))
+
+    return {
+        **acumulacion,
+        'impuesto': impuesto,
+        'capital_neto': capital_neto,
+        'pension_mensual': pension
+    }
@@ -0,0 +1,71 @@
+# Conversión de tasas y tablas de descuento (sin dependencias de interfaz)
+import numpy as np
+import pandas as pd
+from calculos.cache import CacheLRU
+
+PERIODOS_POR_ANIO = {
+    'Mensual': 12, 'Bimestral': 6, 'Trimestral': 4,
+    'Cuatrimestral': 3, 'Semestral': 2, 'Anual': 1
+}
+
+# Tablas de tasas y de factores compartidas por todos los módulos; las que superan
+# MAX_ELEMENTOS_TABLA se calculan al vuelo para no desplazar a las reutilizables
+CACHE_TASAS = CacheLRU(max_entradas=4096, max_bytes=64 * 1024 * 1024)
+MAX_ELEMENTOS_TABLA = 250_000
+
+
+def _clave_tasas(tasas):
+    tasas = np.ascontiguousarray(tasas, dtype=float)
+    return tasas.shape, tasas.tobytes()
+
+
+def _solo_lectura(arreglo):
+    arreglo.setflags(write=False)
+    return arreglo
+
+
+def convertir_tea_a_periodica(tea, frecuencia, en_cache=True):
+    """Convierte TEA a tasa periódica
+
+    `frecuencia` es un nombre, un número de períodos por año o un arreglo de cualquiera de los
+    dos (uno por TEA). Un arreglo de TEAs con una sola frecuencia es una tabla reutilizable y se
+    guarda en CACHE_TASAS (solo lectura); las frecuencias por elemento, los arreglos grandes y
+    `en_cache=False` (tasas de un solo uso, como las de una bisección) se calculan directo.
+    """
+    n = periodos_por_anio(frecuencia)
+    if np.ndim(tea) == 0 and np.ndim(n) == 0:
+        return (1 + tea / 100) ** (1 / n) - 1
+
+    tea = np.asarray(tea, dtype=float)
+    if not en_cache or np.ndim(n) > 0 or tea.size > MAX_ELEMENTOS_TABLA:
+        return (1 + tea / 100) ** (1 / n) - 1
+    return CACHE_TASAS.obtener(
+        ('periodica', int(n), _clave_tasas(tea)),
+        lambda: _solo_lectura((1 + tea / 100) ** (1 / n) - 1)
+    )
+
+
+def factores_descuento(tasa_periodica, horizonte):
+    """Tabla (1 + r)^-k para k = 1..horizonte (tasas x períodos si r es un arreglo), sin caché"""
+    return np.exp(np.multiply.outer(-np.log1p(np.asarray(tasa_periodica, dtype=float)),
+                                    np.arange(1, horizonte + 1)))
+
+
+def tabla_descuento(tea, frecuencia, horizonte):
+    """Factores de descuento por TEA, frecuencia y horizonte (con caché compartida, solo lectura)"""
+    n = periodos_por_anio(frecuencia)
+    tasa_periodica = convertir_tea_a_periodica(tea, n)
+    if np.ndim(n) > 0 or np.size(tea) * horizonte > MAX_ELEMENTOS_TABLA:
+        return factores_descuento(tasa_periodica, horizonte)
+    clave = ('descuento', int(n), int(horizonte), _clave_tasas(tea))
+    return CACHE_TASAS.obtener(clave, lambda: _solo_lectura(factores_descuento(tasa_periodica, horizonte)))
+
+
+def periodos_por_anio(frecuencia):
+    """Períodos por año para una frecuencia o un arreglo de frecuencias (nombres o números)"""
+    if isinstance(frecuencia, str):
+        return PERIODOS_POR_ANIO[frecuencia]
+    frecuencia = np.asarray(frecuencia)
+    if frecuencia.dtype.kind in 'iuf':
+        return frecuencia.astype(int)[()]
+    return pd.Series(frecuencia).map(PERIODOS_POR_ANIO).to_numpy(dtype=int)
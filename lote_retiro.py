@@ -0,0 +1,47 @@
+"""Proyección de retiro por lotes desde la línea de comandos
+
+Lee un archivo de clientes (CSV, Parquet, Arrow IPC o Excel) con las columnas de
+calculos.lote.COLUMNAS_ENTRADA y escribe los resultados en el mismo formato:
+
+    python lote_retiro.py clientes.parquet --procesos 8
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+from calculos.exportacion import leer_tabla, guardar_tabla
+from calculos.lote import proyectar_en_paralelo
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Proyección de retiro para un archivo de clientes")
+    parser.add_argument("entrada", type=Path, help="Archivo de clientes (.csv, .parquet, .arrow o .xlsx)")
+    parser.add_argument("-o", "--salida", type=Path,
+                        help="Archivo de resultados (por defecto <entrada>_resultados con la misma extensión)")
+    parser.add_argument("--procesos", type=int, default=1,
+                        help="Procesos en paralelo (por defecto 1; solo se usan desde MIN_FILAS_PARALELO clientes)")
+    parser.add_argument("--filas-por-lote", type=int, default=100_000, help="Filas que procesa cada tarea")
+    parser.add_argument("--compresion", default=None, help="Códec para Parquet/Arrow (snappy, zstd, lz4, gzip)")
+    args = parser.parse_args(argumentos)
+
+    salida = args.salida or args.entrada.with_name(f"{args.entrada.stem}_resultados{args.entrada.suffix}")
+
+    inicio = time.perf_counter()
+    clientes = leer_tabla(args.entrada)
+    lectura = time.perf_counter()
+    resultados, procesos = proyectar_en_paralelo(clientes, args.procesos, args.filas_por_lote)
+    calculo = time.perf_counter()
+    guardar_tabla(resultados, salida, args.compresion)
+    fin = time.perf_counter()
+
+    filas = len(resultados)
+    print(f"{filas:,} clientes · {procesos} proceso(s)\n"
+          f"  lectura:   {lectura - inicio:.2f} s\n"
+          f"  cálculo:   {calculo - lectura:.2f} s ({filas / max(calculo - lectura, 1e-9):,.0f} clientes/s)\n"
+          f"  escritura: {fin - calculo:.2f} s\n"
+          f"  total:     {fin - inicio:.2f} s ({filas / max(fin - inicio, 1e-9):,.0f} clientes/s)\n"
+          f"Resultados en {salida}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
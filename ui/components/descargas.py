@@ -0,0 +1,113 @@
+import io
+import pandas as pd
+import streamlit as st
+from datetime import datetime
+from calculos.exportacion import FORMATOS_EXPORTACION, COMPRESIONES, exportar_tabla, escribir_xlsx
+
+# Orden de las hojas en el libro Excel de la sesión
+ORDEN_HOJAS = ['Crecimiento', 'Monte Carlo', 'Retiro', 'Flujos Bono']
+
+
+def huella_tabla(df):
+    """Huella del contenido de una tabla: cambia si cambian sus datos, columnas o índice"""
+    return df.shape, tuple(map(str, df.columns)), int(pd.util.hash_pandas_object(df, index=True).sum())
+
+
+def _datos_a_pedido(clave, firma, generar, etiqueta, use_container_width=False):
+    """Bytes de una descarga generados solo cuando el usuario los pide (como el reporte PDF)
+
+    Se guardan en la sesión junto con la firma de lo exportado; si la firma cambia, el
+    archivo preparado se descarta y hay que volver a pedirlo.
+    """
+    preparada = st.session_state.get(clave)
+    if preparada is not None:
+        firma_actual = firma()
+        if preparada[0] == firma_actual:
+            return preparada[1]
+        del st.session_state[clave]
+
+    if not st.button(etiqueta, key=f"{clave}_preparar", use_container_width=use_container_width):
+        return None
+
+    datos = generar()
+    st.session_state[clave] = (firma(), datos)
+    return datos
+
+
+def boton_descarga(df, nombre_archivo, etiqueta, clave, use_container_width=False):
+    """Selector de formato y compresión con su botón de descarga"""
+    col_formato, col_compresion = st.columns(2)
+
+    with col_formato:
+        formato = st.selectbox("Formato", list(FORMATOS_EXPORTACION), key=f"{clave}_formato")
+
+    with col_compresion:
+        compresion = st.selectbox(
+            "Compresión", COMPRESIONES[formato],
+            format_func=lambda c: c or 'Ninguna',
+            disabled=formato == 'CSV',
+            key=f"{clave}_compresion_{formato}"
+        )
+
+    datos = _datos_a_pedido(
+        f"{clave}_archivo",
+        lambda: (formato, compresion, huella_tabla(df)),
+        lambda: exportar_tabla(df, formato, compresion),
+        f"⚙️ Preparar archivo {formato}",
+        use_container_width
+    )
+    if datos is None:
+        return
+
+    st.download_button(
+        label=f"{etiqueta} ({formato})",
+        data=datos,
+        file_name=f"{nombre_archivo}_{datetime.now().strftime('%Y%m%d')}.{FORMATOS_EXPORTACION[formato]['extension']}",
+        mime=FORMATOS_EXPORTACION[formato]['mime'],
+        use_container_width=use_container_width,
+        key=f"{clave}_descarga"
+    )
+
+
+def registrar_hoja(nombre, df):
+    """Guarda el resultado de un módulo para el libro Excel de la sesión"""
+    st.session_state.setdefault('hojas_exportacion', {})[nombre] = df
+
+
+def descartar_hoja(nombre):
+    """Quita del libro Excel un resultado que ya no se está mostrando"""
+    st.session_state.get('hojas_exportacion', {}).pop(nombre, None)
+
+
+def boton_libro_excel(clave, use_container_width=False):
+    """Descarga un libro Excel con una hoja por cada resultado calculado en la sesión"""
+    hojas = st.session_state.get('hojas_exportacion', {})
+    if not hojas:
+        return
+
+    ordenadas = sorted(hojas, key=lambda h: ORDEN_HOJAS.index(h) if h in ORDEN_HOJAS else len(ORDEN_HOJAS))
+
+    def generar():
+        buffer = io.BytesIO()
+        escribir_xlsx({nombre: hojas[nombre] for nombre in ordenadas}, buffer)
+        return buffer.getvalue()
+
+    datos = _datos_a_pedido(
+        f"{clave}_archivo",
+        lambda: tuple((nombre, huella_tabla(hojas[nombre])) for nombre in ordenadas),
+        generar,
+        f"⚙️ Preparar libro Excel ({len(hojas)} hojas)",
+        use_container_width
+    )
+    if datos is None:
+        return
+
+    st.download_button(
+        label=f"📗 Descargar libro Excel ({len(hojas)} hojas)",
+        data=datos,
+        file_name=f"simulador_financiero_{datetime.now().strftime('%Y%m%d')}.xlsx",
+        mime=FORMATOS_EXPORTACION['Excel']['mime'],
+        help="Incluye los resultados de los módulos que ya calculaste: " + ", ".join(ordenadas),
+        use_container_width=use_container_width,
+        key=f"{clave}_libro"
+    )
@@ -0,0 +1,256 @@
+# Plantillas de gráficos: el layout se arma una vez por sesión y en cada rerun solo se
+# reemplazan los arreglos de las trazas (plotly los envía como binario, sin pasar por listas)
+import numpy as np
+import streamlit as st
+import plotly.graph_objects as go
+from utils.utils import formato_moneda
+from calculos.muestreo import reducir_serie
+
+# Puntos máximos por traza que se envían al navegador; los datos completos no se tocan
+MAX_PUNTOS_GRAFICO = 2000
+
+TITULO_SENSIBILIDAD = "Análisis de Sensibilidad: Valor del Bono vs Tasa de Descuento"
+
+
+def _plantilla_crecimiento():
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        mode='lines',
+        name='Aportes Acumulados',
+        fill='tozeroy',
+        line=dict(color='#3B82F6', width=2)
+    ))
+    fig.add_trace(go.Scatter(
+        mode='lines',
+        name='Capital Total',
+        fill='tonexty',
+        line=dict(color='#10B981', width=2)
+    ))
+    fig.update_layout(
+        xaxis_title="Edad (años)",
+        yaxis_title="Valor (USD)",
+        hovermode='x unified',
+        height=450,
+        template='plotly_white'
+    )
+    return fig
+
+
+def _plantilla_flujos():
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        name='Flujo de Caja',
+        marker_color='#3B82F6',
+        hovertemplate='Año: %{x:.2f}<br>Flujo: $%{y:,.2f}<extra></extra>'
+    ))
+    fig.add_trace(go.Bar(
+        name='Valor Presente',
+        marker_color='#10B981',
+        hovertemplate='Año: %{x:.2f}<br>VP: $%{y:,.2f}<extra></extra>'
+    ))
+    fig.update_layout(
+        xaxis_title="Año",
+        yaxis_title="Valor (USD)",
+        barmode='group',
+        height=400,
+        template='plotly_white',
+        hovermode='x unified'
+    )
+    return fig
+
+
+def _plantilla_vp_acumulado():
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        mode='lines+markers',
+        name='VP Acumulado',
+        line=dict(color='#8b5cf6', width=3),
+        marker=dict(size=6),
+        fill='tozeroy',
+        fillcolor='rgba(139, 92, 246, 0.2)',
+        hovertemplate='Año: %{x:.2f}<br>VP Acumulado: $%{y:,.2f}<extra></extra>'
+    ))
+    fig.add_hline(
+        y=0,
+        line_dash="dash",
+        line_color="red",
+        annotation_text="Valor Nominal",
+        annotation_position="right"
+    )
+    fig.update_layout(
+        xaxis_title="Año",
+        yaxis_title="Valor Presente Acumulado (USD)",
+        height=400,
+        template='plotly_white',
+        hovermode='x'
+    )
+    return fig
+
+
+def _plantilla_sensibilidad():
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        mode='lines',
+        name='Valor del Bono',
+        line=dict(color='#6366f1', width=3),
+        fill='tozeroy',
+        fillcolor='rgba(99, 102, 241, 0.2)'
+    ))
+    fig.add_hline(
+        y=0,
+        line_dash="dash",
+        line_color="red",
+        annotation_text="Valor Nominal"
+    )
+    fig.add_vline(
+        x=0,
+        line_dash="dot",
+        line_color="green",
+        annotation_text="Tasa Actual"
+    )
+    fig.update_layout(
+        title=TITULO_SENSIBILIDAD,
+        xaxis_title="Tasa de Descuento (%)",
+        yaxis_title="Valor Presente (USD)",
+        height=400,
+        template='plotly_white'
+    )
+    return fig
+
+
+def _plantilla_mapa_iso(titulo_x, titulo_y, titulo_escala, hover):
+    fig = go.Figure()
+    fig.add_trace(go.Heatmap(
+        colorscale='Viridis',
+        colorbar=dict(title=titulo_escala),
+        hovertemplate=hover + '<extra></extra>'
+    ))
+    fig.add_trace(go.Contour(
+        contours=dict(coloring='lines', showlabels=True, labelfont=dict(color='white')),
+        line=dict(color='white', width=3),
+        showscale=False,
+        hoverinfo='skip',
+        name='Objetivo'
+    ))
+    fig.update_layout(
+        xaxis_title=titulo_x,
+        yaxis_title=titulo_y,
+        height=450,
+        template='plotly_white'
+    )
+    return fig
+
+
+def _plantilla_barrido_saldo():
+    return _plantilla_mapa_iso(
+        "Aporte Periódico (USD)", "TEA (%)", "Saldo (USD)",
+        'Aporte: $%{x:,.0f}<br>TEA: %{y:.2f}%<br>Saldo: $%{z:,.0f}'
+    )
+
+
+def _plantilla_barrido_aporte():
+    return _plantilla_mapa_iso(
+        "Plazo (años)", "TEA (%)", "Aporte (USD)",
+        'Plazo: %{x} años<br>TEA: %{y:.2f}%<br>Aporte requerido: $%{z:,.0f}'
+    )
+
+
+PLANTILLAS = {
+    'crecimiento': _plantilla_crecimiento,
+    'flujos': _plantilla_flujos,
+    'vp_acumulado': _plantilla_vp_acumulado,
+    'sensibilidad': _plantilla_sensibilidad,
+    'barrido_saldo': _plantilla_barrido_saldo,
+    'barrido_aporte': _plantilla_barrido_aporte
+}
+
+
+def obtener_figura(tipo):
+    """Figura de la sesión para un tipo de gráfico, armada desde su plantilla la primera vez"""
+    figuras = st.session_state.setdefault('_figuras', {})
+    if tipo not in figuras:
+        figuras[tipo] = PLANTILLAS[tipo]()
+    return figuras[tipo]
+
+
+def actualizar_trazas(fig, *datos):
+    """Reemplaza los arreglos x/y de cada traza de la figura, en orden"""
+    for traza, (x, y) in zip(fig.data, datos):
+        traza.x = np.asarray(x)
+        traza.y = np.asarray(y)
+
+
+def _mover_linea_horizontal(fig, indice, y, texto=None):
+    fig.layout.shapes[indice].update(y0=y, y1=y)
+    fig.layout.annotations[indice].update(y=y)
+    if texto is not None:
+        fig.layout.annotations[indice].text = texto
+
+
+def figura_crecimiento(edades, aportes_acumulados, saldo_final, max_puntos=MAX_PUNTOS_GRAFICO):
+    """Gráfico de crecimiento de la cartera (Módulo A)"""
+    edades, aportes_acumulados, saldo_final = reducir_serie(
+        edades, aportes_acumulados, saldo_final, max_puntos=max_puntos
+    )
+    fig = obtener_figura('crecimiento')
+    with fig.batch_update():
+        actualizar_trazas(fig, (edades, aportes_acumulados), (edades, saldo_final))
+    return fig
+
+
+def figura_flujos(anios, flujos, valores_presentes, max_puntos=MAX_PUNTOS_GRAFICO):
+    """Gráfico de flujos de caja vs valor presente"""
+    # Mínimos y máximos por cubeta: las barras conservan el pago final del nominal
+    anios, flujos, valores_presentes = reducir_serie(
+        anios, flujos, valores_presentes, max_puntos=max_puntos, metodo='min_max'
+    )
+    fig = obtener_figura('flujos')
+    with fig.batch_update():
+        actualizar_trazas(fig, (anios, flujos), (anios, valores_presentes))
+    return fig
+
+
+def figura_vp_acumulado(anios, vp_acumulado, valor_nominal, max_puntos=MAX_PUNTOS_GRAFICO):
+    """Gráfico de valor presente acumulado con la línea del valor nominal"""
+    anios, vp_acumulado = reducir_serie(anios, vp_acumulado, max_puntos=max_puntos)
+    fig = obtener_figura('vp_acumulado')
+    with fig.batch_update():
+        actualizar_trazas(fig, (anios, vp_acumulado))
+        _mover_linea_horizontal(fig, 0, valor_nominal, f"Valor Nominal: {formato_moneda(valor_nominal)}")
+    return fig
+
+
+def figura_sensibilidad(tasas, valores, valor_nominal, tea, max_puntos=MAX_PUNTOS_GRAFICO, titulo=None):
+    """Curva precio/tasa con las líneas del valor nominal y de la tasa actual"""
+    tasas, valores = reducir_serie(tasas, valores, max_puntos=max_puntos)
+    fig = obtener_figura('sensibilidad')
+    with fig.batch_update():
+        actualizar_trazas(fig, (tasas, valores))
+        _mover_linea_horizontal(fig, 0, valor_nominal)
+        fig.layout.shapes[1].update(x0=tea, x1=tea)
+        fig.layout.annotations[1].update(x=tea)
+        fig.layout.title.text = titulo or TITULO_SENSIBILIDAD
+    return fig
+
+
+def _actualizar_mapa_iso(fig, x, y, z, nivel):
+    """Reemplaza la grilla del mapa de calor y mueve la curva de nivel al valor indicado"""
+    for traza in fig.data:
+        traza.update(x=np.asarray(x), y=np.asarray(y), z=np.asarray(z))
+    fig.data[1].contours.update(start=nivel, end=nivel, size=max(abs(nivel), 1.0))
+
+
+def figura_barrido_saldo(aportes, teas, saldos, objetivo):
+    """Mapa de calor del saldo final (TEA x aporte) con la curva del capital objetivo"""
+    fig = obtener_figura('barrido_saldo')
+    with fig.batch_update():
+        _actualizar_mapa_iso(fig, aportes, teas, saldos, objetivo)
+    return fig
+
+
+def figura_barrido_aporte(plazos, teas, aportes_requeridos, aporte_actual):
+    """Mapa de calor del aporte requerido (TEA x plazo) con la curva del aporte actual"""
+    fig = obtener_figura('barrido_aporte')
+    with fig.batch_update():
+        _actualizar_mapa_iso(fig, plazos, teas, aportes_requeridos, aporte_actual)
+    return fig
@@ -0,0 +1,62 @@
+from collections import OrderedDict
+import streamlit as st
+from calculos.acumulacion import clave_acumulacion, proyeccion_acumulacion
+
+# Parámetros de acumulación compartidos por los módulos A y B, con sus valores iniciales
+PARAMETROS_ACUMULACION = {
+    'edad_actual': 30,
+    'monto_inicial': 10000.0,
+    'aporte_periodico': 500.0,
+    'frecuencia': 'Mensual',
+    'plazo_anios': 30,
+    'tea_cartera': 8.0
+}
+
+# Resultados que conserva cada sesión aunque la caché del proceso los haya desalojado
+MAX_RESULTADOS_SESION = 32
+
+
+def clave_parametro(nombre):
+    """Clave del widget de un parámetro de acumulación (la misma en todos los módulos)"""
+    return f"acumulacion_{nombre}"
+
+
+def restaurar_parametros():
+    """Vuelve a cargar en los widgets los parámetros de acumulación de la sesión
+
+    Streamlit borra el estado de los widgets que no se dibujan en un rerun, así que al cambiar
+    de módulo los valores se recuperan de una copia que no pertenece a ningún widget.
+    """
+    guardados = st.session_state.setdefault('parametros_acumulacion', dict(PARAMETROS_ACUMULACION))
+    for nombre, valor in guardados.items():
+        if clave_parametro(nombre) not in st.session_state:
+            st.session_state[clave_parametro(nombre)] = valor
+
+
+def guardar_parametros():
+    """Copia los valores actuales de los widgets de acumulación para el próximo módulo"""
+    st.session_state['parametros_acumulacion'] = {
+        nombre: st.session_state[clave_parametro(nombre)] for nombre in PARAMETROS_ACUMULACION
+    }
+
+
+def resultado_sesion(clave, calcular):
+    """Resultado guardado en la sesión para `clave`; si no está se obtiene con `calcular()`"""
+    resultados = st.session_state.setdefault('resultados', OrderedDict())
+    if clave in resultados:
+        resultados.move_to_end(clave)
+        return resultados[clave]
+
+    resultados[clave] = calcular()
+    while len(resultados) > MAX_RESULTADOS_SESION:
+        resultados.popitem(last=False)
+    return resultados[clave]
+
+
+def acumulacion_sesion(edad_actual, monto_inicial, aporte_periodico, frecuencia, plazo_anios, tea):
+    """Acumulación y cronograma compartidos entre módulos (sesión y luego caché del proceso)
+
+    El `cronograma` es compartido y no debe modificarse.
+    """
+    parametros = (edad_actual, monto_inicial, aporte_periodico, frecuencia, plazo_anios, tea)
+    return dict(resultado_sesion(clave_acumulacion(*parametros), lambda: proyeccion_acumulacion(*parametros)))
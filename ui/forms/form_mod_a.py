@@ -1,102 +1,81 @@
-from utils.utils import convertir_tea_a_periodica, formato_moneda, mostrar_ayuda
+from utils.utils import convertir_tea_a_periodica, formato_moneda, columna_moneda, mostrar_ayuda
+from calculos.acumulacion import aporte_requerido, barrido_acumulacion
+from calculos.tasas import PERIODOS_POR_ANIO
+from calculos.montecarlo import proyeccion_estocastica, probabilidad_objetivo
+from ui.components.figuras import figura_crecimiento, figura_barrido_saldo, figura_barrido_aporte
+from ui.components.descargas import boton_descarga, boton_libro_excel, registrar_hoja, descartar_hoja
+from ui.components.sesion import restaurar_parametros, guardar_parametros, clave_parametro, acumulacion_sesion
+import numpy as np
 import pandas as pd 
 import streamlit as st
 import plotly.graph_objects as go
 import plotly.express as px
-from datetime import datetime
 def show_mod_a_form():
     st.header("📈 Módulo A: Crecimiento de Cartera")
     st.markdown("Calcula cómo crece tu capital en dólares según tus aportes e inversiones.")
     
-    # Parámetros de entrada
+    # Parámetros de entrada (compartidos con el Módulo B durante la sesión)
+    restaurar_parametros()
     with st.expander("⚙️ Parámetros de Inversión", expanded=True):
         col1, col2, col3 = st.columns(3)
         
         with col1:
             edad_actual = st.number_input(
                 "Edad Actual",
-                min_value=18, max_value=100, value=30, step=1,
+                min_value=18, max_value=100, step=1,
+                key=clave_parametro('edad_actual'),
                 help="Tu edad actual en años"
             )
             
             monto_inicial = st.number_input(
                 "Monto Inicial (USD)",
-                min_value=0.0, value=10000.0, step=100.0,
+                min_value=0.0, step=100.0,
+                key=clave_parametro('monto_inicial'),
                 help="Capital inicial que invertirás"
             )
         
         with col2:
             aporte_periodico = st.number_input(
                 "Aporte Periódico (USD)",
-                min_value=0.0, value=500.0, step=50.0,
+                min_value=0.0, step=50.0,
+                key=clave_parametro('aporte_periodico'),
                 help="Cantidad que aportarás regularmente"
             )
             
             frecuencia = st.selectbox(
                 "Frecuencia de Aportes",
                 ['Mensual', 'Trimestral', 'Semestral', 'Anual'],
+                key=clave_parametro('frecuencia'),
                 help="Con qué regularidad realizarás tus aportes"
             )
         
         with col3:
             plazo_anios = st.number_input(
                 "Plazo (Años)",
-                min_value=1, max_value=70, value=30, step=1,
+                min_value=1, max_value=70, step=1,
+                key=clave_parametro('plazo_anios'),
                 help="Número de años que mantendrás tu inversión"
             )
             
             tea_cartera = st.number_input(
                 "Tasa Efectiva Anual (%)",
-                min_value=0.0, max_value=50.0, value=8.0, step=0.1,
+                min_value=0.0, max_value=50.0, step=0.1,
+                key=clave_parametro('tea_cartera'),
                 help="Rentabilidad anual esperada (ej: 8% para fondos diversificados)"
             )
+    guardar_parametros()
     
     # Validaciones
     if monto_inicial == 0 and aporte_periodico == 0:
         st.warning("⚠️ Debes ingresar un monto inicial o un aporte periódico.")
     else:
-        # Cálculos
-        periodos_por_anio = {'Mensual': 12, 'Trimestral': 4, 'Semestral': 2, 'Anual': 1}
-        num_periodos = periodos_por_anio[frecuencia]
-        total_periodos = plazo_anios * num_periodos
-        tasa_periodica = convertir_tea_a_periodica(tea_cartera, frecuencia)
-        
-        # Simulación período a período
-        saldo = monto_inicial
-        aporte_acumulado = monto_inicial
-        datos = []
-        
-        datos.append({
-            'Periodo': 0,
-            'Edad': edad_actual,
-            'Saldo Inicial': monto_inicial,
-            'Intereses': 0,
-            'Aporte': 0,
-            'Saldo Final': monto_inicial,
-            'Aportes Acumulados': monto_inicial
-        })
-        
-        for i in range(1, total_periodos + 1):
-            saldo_inicial = saldo
-            intereses = saldo * tasa_periodica
-            saldo = saldo + intereses + aporte_periodico
-            aporte_acumulado += aporte_periodico
-            
-            # Guardar datos anuales
-            if i % num_periodos == 0 or i == total_periodos:
-                datos.append({
-                    'Periodo': i,
-                    'Edad': edad_actual + i // num_periodos,
-                    'Saldo Inicial': saldo_inicial,
-                    'Intereses': intereses,
-                    'Aporte': aporte_periodico,
-                    'Saldo Final': saldo,
-                    'Aportes Acumulados': aporte_acumulado
-                })
-        
-        df_cartera = pd.DataFrame(datos)
-        saldo_final = saldo
-        ganancia_total = saldo_final - aporte_acumulado
+        # Cálculos (forma cerrada; el resultado y su detalle anual se comparten con el Módulo B)
+        acumulacion = acumulacion_sesion(edad_actual, monto_inicial, aporte_periodico, frecuencia, plazo_anios, tea_cartera)
+        num_periodos = acumulacion['num_periodos']
+        saldo_final = acumulacion['saldo_final']
+        aporte_acumulado = acumulacion['aporte_total']
+        ganancia_total = acumulacion['ganancia_total']
+        df_cartera = acumulacion['cronograma']
         
         # Métricas principales
         st.divider()
@@ -127,32 +106,10 @@ def show_mod_a_form():
         st.divider()
         st.subheader("📊 Proyección de Crecimiento")
         
-        fig = go.Figure()
-        
-        fig.add_trace(go.Scatter(
-            x=df_cartera['Edad'],
-            y=df_cartera['Aportes Acumulados'],
-            mode='lines',
-            name='Aportes Acumulados',
-            fill='tozeroy',
-            line=dict(color='#3B82F6', width=2)
-        ))
-        
-        fig.add_trace(go.Scatter(
-            x=df_cartera['Edad'],
-            y=df_cartera['Saldo Final'],
-            mode='lines',
-            name='Capital Total',
-            fill='tonexty',
-            line=dict(color='#10B981', width=2)
-        ))
-        
-        fig.update_layout(
-            xaxis_title="Edad (años)",
-            yaxis_title="Valor (USD)",
-            hovermode='x unified',
-            height=450,
-            template='plotly_white'
+        fig = figura_crecimiento(
+            df_cartera['Edad'].to_numpy(),
+            df_cartera['Aportes Acumulados'].to_numpy(),
+            df_cartera['Saldo Final'].to_numpy()
         )
         
         st.plotly_chart(fig, use_container_width=True)
@@ -162,23 +119,173 @@ def show_mod_a_form():
         st.subheader("📋 Detalle por Período")
         
         # Mostrar solo datos anuales
-        df_mostrar = df_cartera[df_cartera['Periodo'] % num_periodos == 0].copy()
-        df_mostrar['Saldo Inicial'] = df_mostrar['Saldo Inicial'].apply(formato_moneda)
-        df_mostrar['Intereses'] = df_mostrar['Intereses'].apply(formato_moneda)
-        df_mostrar['Aportes Acumulados'] = df_mostrar['Aportes Acumulados'].apply(formato_moneda)
-        df_mostrar['Saldo Final'] = df_mostrar['Saldo Final'].apply(formato_moneda)
+        df_mostrar = df_cartera[df_cartera['Periodo'] % num_periodos == 0]
         
         st.dataframe(
             df_mostrar[['Edad', 'Saldo Inicial', 'Intereses', 'Aportes Acumulados', 'Saldo Final']],
             use_container_width=True,
-            hide_index=True
+            hide_index=True,
+            column_config={
+                "Saldo Inicial": columna_moneda("Saldo Inicial"),
+                "Intereses": columna_moneda("Intereses"),
+                "Aportes Acumulados": columna_moneda("Aportes Acumulados"),
+                "Saldo Final": columna_moneda("Saldo Final")
+            }
         )
         
         # Botón de descarga
-        csv = df_cartera.to_csv(index=False).encode('utf-8')
-        st.download_button(
-            label="📥 Descargar datos en CSV",
-            data=csv,
-            file_name=f"proyeccion_cartera_{datetime.now().strftime('%Y%m%d')}.csv",
-            mime="text/csv"
-        )
+        registrar_hoja('Crecimiento', df_cartera)
+        boton_descarga(df_cartera, "proyeccion_cartera", "📥 Descargar datos", clave="descarga_cartera")
+        
+        # Simulación Monte Carlo
+        st.divider()
+        with st.expander("🎲 Simulación Monte Carlo", expanded=False):
+            st.markdown("Proyecta miles de trayectorias con rentabilidad aleatoria alrededor de la TEA esperada.")
+            
+            col1, col2, col3 = st.columns(3)
+            
+            with col1:
+                volatilidad = st.number_input(
+                    "Volatilidad Anual (%)",
+                    min_value=0.0, max_value=80.0, value=15.0, step=0.5,
+                    help="Desviación estándar anual de la rentabilidad (ej: 15% para renta variable)"
+                )
+            
+            with col2:
+                n_trayectorias = st.number_input(
+                    "Número de Trayectorias",
+                    min_value=1000, max_value=500000, value=100000, step=10000
+                )
+            
+            with col3:
+                objetivo = st.number_input(
+                    "Capital Objetivo (USD)",
+                    min_value=0.0, value=float(round(saldo_final, -3)), step=1000.0,
+                    help="Monto que quieres alcanzar al final del plazo"
+                )
+            
+            if st.checkbox("Ejecutar simulación", key="ejecutar_montecarlo"):
+                simulacion = proyeccion_estocastica(
+                    monto_inicial, aporte_periodico, frecuencia, plazo_anios,
+                    tea_cartera, volatilidad, n_trayectorias
+                )
+                p5, p50, p95 = (simulacion['percentiles'][p] for p in (5, 50, 95))
+                prob_objetivo = probabilidad_objetivo(simulacion['saldos_finales'], objetivo)
+                
+                col1, col2, col3 = st.columns(3)
+                
+                with col1:
+                    st.metric("🎯 Probabilidad de Alcanzar el Objetivo", f"{prob_objetivo * 100:.1f}%")
+                
+                with col2:
+                    st.metric("📉 Escenario Pesimista (P5)", formato_moneda(p5[-1]))
+                
+                with col3:
+                    st.metric("📈 Escenario Optimista (P95)", formato_moneda(p95[-1]))
+                
+                edades = edad_actual + np.arange(len(p50))
+                registrar_hoja('Monte Carlo', pd.DataFrame({'Edad': edades, 'P5': p5, 'P50': p50, 'P95': p95}))
+                
+                fig_mc = go.Figure()
+                
+                fig_mc.add_trace(go.Scatter(
+                    x=edades, y=p95, mode='lines', name='P95',
+                    line=dict(color='#10B981', width=1)
+                ))
+                
+                fig_mc.add_trace(go.Scatter(
+                    x=edades, y=p5, mode='lines', name='P5',
+                    fill='tonexty', fillcolor='rgba(16, 185, 129, 0.2)',
+                    line=dict(color='#EF4444', width=1)
+                ))
+                
+                fig_mc.add_trace(go.Scatter(
+                    x=edades, y=p50, mode='lines', name='Mediana (P50)',
+                    line=dict(color='#3B82F6', width=3)
+                ))
+                
+                fig_mc.add_hline(
+                    y=objetivo,
+                    line_dash="dash",
+                    line_color="gray",
+                    annotation_text="Objetivo"
+                )
+                
+                fig_mc.update_layout(
+                    xaxis_title="Edad (años)",
+                    yaxis_title="Valor (USD)",
+                    hovermode='x unified',
+                    height=450,
+                    template='plotly_white'
+                )
+                
+                st.plotly_chart(fig_mc, use_container_width=True)
+
+            else:
+                descartar_hoja('Monte Carlo')
+
+        # Barrido de parámetros
+        st.divider()
+        with st.expander("🧮 Barrido de Parámetros", expanded=False):
+            st.markdown("Evalúa todas las combinaciones de TEA, aporte y plazo a la vez para ver "
+                        "qué aporte necesitas para llegar a un capital objetivo.")
+
+            col1, col2, col3 = st.columns(3)
+
+            with col1:
+                tea_min, tea_max = st.slider("Rango de TEA (%)", 0.0, 50.0, (2.0, 15.0), 0.5)
+
+            with col2:
+                aporte_min, aporte_max = st.slider("Rango de Aporte (USD)", 0.0, 10000.0,
+                                                   (0.0, max(2000.0, aporte_periodico * 2)), 50.0)
+
+            with col3:
+                plazo_min, plazo_max = st.slider("Rango de Plazo (años)", 1, 70, (5, 40), 1)
+
+            col1, col2 = st.columns(2)
+
+            with col1:
+                puntos_barrido = st.number_input("Puntos por eje", 10, 200, 100, 10,
+                                                 help="Resolución de las grillas de TEA y de aporte")
+
+            with col2:
+                objetivo_barrido = st.number_input("Capital Objetivo (USD)", min_value=1.0,
+                                                   value=float(max(round(saldo_final, -3), 1000.0)),
+                                                   step=1000.0, key="objetivo_barrido")
+
+            if st.checkbox("Calcular barrido", key="ejecutar_barrido"):
+                teas = np.linspace(tea_min, tea_max, puntos_barrido)
+                aportes = np.linspace(aporte_min, aporte_max, puntos_barrido)
+                plazos = np.arange(plazo_min, plazo_max + 1)
+                saldos = barrido_acumulacion(monto_inicial, frecuencia, teas, aportes, plazos)
+
+                plazo_mapa = st.select_slider("Plazo del mapa (años)", options=plazos.tolist(),
+                                              value=int(np.clip(plazo_anios, plazo_min, plazo_max)))
+                k = plazo_mapa - plazo_min
+
+                col1, col2 = st.columns(2)
+
+                with col1:
+                    st.metric("Combinaciones evaluadas", f"{saldos.size:,}")
+
+                with col2:
+                    st.metric("Alcanzan el objetivo", f"{(saldos >= objetivo_barrido).mean() * 100:.1f}%")
+
+                st.markdown(f"**Saldo final a {plazo_mapa} años** (la curva blanca marca el objetivo)")
+                st.plotly_chart(figura_barrido_saldo(aportes, teas, saldos[:, :, k], objetivo_barrido),
+                                use_container_width=True)
+
+                # Aporte que hace falta en cada TEA y plazo (0 si el monto inicial ya alcanza)
+                requerido = np.maximum(aporte_requerido(
+                    objetivo_barrido, monto_inicial,
+                    convertir_tea_a_periodica(teas, frecuencia)[:, None],
+                    plazos[None, :] * PERIODOS_POR_ANIO[frecuencia]
+                ), 0.0)
+
+                st.markdown("**Aporte requerido para el objetivo** (la curva blanca marca tu aporte actual)")
+                st.plotly_chart(figura_barrido_aporte(plazos, teas, requerido, aporte_periodico),
+                                use_container_width=True)
+
+        # Libro Excel al final, cuando todas las hojas de esta ejecución ya están registradas
+        st.divider()
+        boton_libro_excel(clave="libro_mod_a")
@@ -1,4 +1,14 @@
-from utils.utils import convertir_tea_a_periodica, formato_moneda, mostrar_ayuda
+from utils.utils import formato_moneda, mostrar_ayuda
+from calculos.retiro import obtener_tasa_impuesto, aplicar_impuesto, calcular_pension_mensual, proyectar_retiro
+from calculos.montecarlo import analisis_ruina
+from calculos.objetivos import (
+    INCOGNITAS, capital_neto_objetivo, resolver_aporte, resolver_monto_inicial, resolver_tea, resolver_edad_retiro
+)
+from ui.components.descargas import boton_descarga, boton_libro_excel, registrar_hoja
+from ui.components.sesion import restaurar_parametros, guardar_parametros, clave_parametro, acumulacion_sesion
+import os
+import time
+import numpy as np
 import pandas as pd 
 import streamlit as st
 import plotly.graph_objects as go
@@ -8,38 +18,30 @@ def show_mod_b_form():
     st.header("🏦 Módulo B: Proyección de Retiro")
     st.markdown("Calcula tu pensión mensual o retiro total según el capital acumulado.")
     
-    # Primero calculamos la cartera (igual que módulo A)
+    # Primero calculamos la cartera (mismos parámetros y resultado que el Módulo A en la sesión)
+    restaurar_parametros()
     with st.expander("⚙️ Parámetros de Acumulación", expanded=True):
         col1, col2, col3 = st.columns(3)
         
         with col1:
-            edad_actual = st.number_input("Edad Actual", 18, 100, 30, 1)
-            monto_inicial = st.number_input("Monto Inicial (USD)", 0.0, value=10000.0, step=100.0)
+            edad_actual = st.number_input("Edad Actual", 18, 100, step=1, key=clave_parametro('edad_actual'))
+            monto_inicial = st.number_input("Monto Inicial (USD)", 0.0, step=100.0, key=clave_parametro('monto_inicial'))
         
         with col2:
-            aporte_periodico = st.number_input("Aporte Periódico (USD)", 0.0, value=500.0, step=50.0)
-            frecuencia = st.selectbox("Frecuencia", ['Mensual', 'Trimestral', 'Semestral', 'Anual'])
+            aporte_periodico = st.number_input("Aporte Periódico (USD)", 0.0, step=50.0, key=clave_parametro('aporte_periodico'))
+            frecuencia = st.selectbox("Frecuencia", ['Mensual', 'Trimestral', 'Semestral', 'Anual'],
+                                      key=clave_parametro('frecuencia'))
         
         with col3:
-            plazo_anios = st.number_input("Plazo (Años)", 1, 70, 30, 1)
-            tea_cartera = st.number_input("TEA Acumulación (%)", 0.0, 50.0, 8.0, 0.1)
+            plazo_anios = st.number_input("Plazo (Años)", 1, 70, step=1, key=clave_parametro('plazo_anios'))
+            tea_cartera = st.number_input("TEA Acumulación (%)", 0.0, 50.0, step=0.1, key=clave_parametro('tea_cartera'))
     
-    # Cálculo de capital acumulado
-    periodos_por_anio = {'Mensual': 12, 'Trimestral': 4, 'Semestral': 2, 'Anual': 1}
-    num_periodos = periodos_por_anio[frecuencia]
-    total_periodos = plazo_anios * num_periodos
-    tasa_periodica = convertir_tea_a_periodica(tea_cartera, frecuencia)
+    guardar_parametros()
     
-    saldo = monto_inicial
-    aporte_total = monto_inicial
-    
-    for i in range(1, total_periodos + 1):
-        intereses = saldo * tasa_periodica
-        saldo = saldo + intereses + aporte_periodico
-        aporte_total += aporte_periodico
-    
-    capital_acumulado = saldo
-    ganancia_total = capital_acumulado - aporte_total
+    # Cálculo de capital acumulado (reutiliza el del Módulo A si los parámetros coinciden)
+    acumulacion = acumulacion_sesion(edad_actual, monto_inicial, aporte_periodico, frecuencia, plazo_anios, tea_cartera)
+    capital_acumulado = acumulacion['saldo_final']
+    ganancia_total = acumulacion['ganancia_total']
     edad_retiro = edad_actual + plazo_anios
     
     # Parámetros de retiro
@@ -75,9 +77,8 @@ def show_mod_b_form():
                 )
     
     # Cálculo de impuestos
-    tasa_impuesto = 0.295 if 'Extranjera' in tipo_impuesto else 0.05
-    impuesto = ganancia_total * tasa_impuesto
-    capital_neto = capital_acumulado - impuesto
+    tasa_impuesto = obtener_tasa_impuesto(tipo_impuesto)
+    impuesto, capital_neto = aplicar_impuesto(capital_acumulado, ganancia_total, tasa_impuesto)
     
     # Resultados
     st.divider()
@@ -104,11 +105,10 @@ def show_mod_b_form():
         st.info(f"📅 Este monto estará disponible cuando cumplas {edad_retiro} años.")
         
     else:  # Pensión Mensual
-        tasa_mensual = convertir_tea_a_periodica(tea_retiro, 'Mensual')
         meses_retiro = anios_retiro * 12
         
         # Fórmula de anualidad: PMT = PV * r / (1 - (1 + r)^-n)
-        pension_mensual = capital_neto * tasa_mensual / (1 - (1 + tasa_mensual) ** -meses_retiro)
+        pension_mensual = float(calcular_pension_mensual(capital_neto, tea_retiro, anios_retiro))
         
         col1, col2 = st.columns(2)
         
@@ -121,7 +121,143 @@ def show_mod_b_form():
             total_recibido = pension_mensual * meses_retiro
             st.metric("Total a Recibir", formato_moneda(total_recibido))
             st.metric("Pensión Anual", formato_moneda(pension_mensual * 12))
-    
+
+        # Riesgo de agotamiento con retornos volátiles (secuencia de retornos)
+        with st.expander("🎲 Riesgo de Agotamiento del Capital (Monte Carlo)", expanded=False):
+            st.markdown("Simula retornos aleatorios en la acumulación y en el retiro para estimar "
+                        "la probabilidad de quedarte sin fondos antes de terminar la pensión.")
+
+            col1, col2, col3, col4 = st.columns(4)
+
+            with col1:
+                volatilidad = st.number_input("Volatilidad Acumulación (%)", 0.0, 80.0, 15.0, 0.5)
+
+            with col2:
+                volatilidad_retiro = st.number_input("Volatilidad Retiro (%)", 0.0, 80.0, 8.0, 0.5)
+
+            with col3:
+                n_trayectorias = st.number_input("Trayectorias", 10000, 2000000, 100000, 10000)
+
+            with col4:
+                procesos = st.number_input("Procesos", 1, os.cpu_count() or 1, os.cpu_count() or 1, 1,
+                                           help="Núcleos usados para repartir las trayectorias")
+
+            if st.checkbox("Ejecutar simulación", key="ejecutar_ruina"):
+                inicio = time.perf_counter()
+                ruina = analisis_ruina(
+                    monto_inicial, aporte_periodico, frecuencia, plazo_anios, tea_cartera,
+                    tasa_impuesto, tea_retiro, anios_retiro, pension_mensual, volatilidad,
+                    volatilidad_retiro, n_trayectorias, procesos=procesos
+                )
+                duracion = time.perf_counter() - inicio
+
+                col1, col2, col3 = st.columns(3)
+
+                with col1:
+                    st.metric("⚠️ Probabilidad de Agotamiento", f"{ruina['prob_ruina'] * 100:.1f}%")
+
+                with col2:
+                    if len(ruina['anios_agotamiento']):
+                        edad_mediana = edad_retiro + float(np.median(ruina['anios_agotamiento']))
+                        st.metric("🎂 Edad Mediana de Agotamiento", f"{edad_mediana:.0f} años")
+                    else:
+                        st.metric("🎂 Edad Mediana de Agotamiento", "No se agota")
+
+                with col3:
+                    st.metric("💼 Capital Neto Mediano", formato_moneda(ruina['capital_neto_percentiles'][50]))
+
+                if len(ruina['anios_agotamiento']):
+                    conteo = np.bincount(ruina['anios_agotamiento'], minlength=anios_retiro)
+
+                    fig_ruina = go.Figure(data=[
+                        go.Bar(
+                            x=edad_retiro + np.arange(len(conteo)),
+                            y=conteo / ruina['n_trayectorias'] * 100,
+                            marker_color='#EF4444',
+                            hovertemplate='Edad: %{x}<br>Trayectorias agotadas: %{y:.2f}%<extra></extra>'
+                        )
+                    ])
+                    fig_ruina.update_layout(
+                        title='Distribución de la Edad de Agotamiento',
+                        xaxis_title='Edad (años)',
+                        yaxis_title='% de trayectorias',
+                        height=350,
+                        template='plotly_white'
+                    )
+                    st.plotly_chart(fig_ruina, use_container_width=True)
+
+                st.caption(f"{ruina['n_trayectorias']:,} trayectorias en {ruina['procesos']} proceso(s) · "
+                           f"{duracion:.2f} s")
+
+        # Búsqueda de meta: qué parámetro hay que cambiar para llegar a una pensión neta
+        with st.expander("🎯 Meta de Pensión", expanded=False):
+            col1, col2 = st.columns(2)
+
+            with col1:
+                pension_objetivo = st.number_input(
+                    "Pensión Mensual Objetivo (USD)", min_value=1.0,
+                    value=float(max(round(pension_mensual * 1.5, -2), 100.0)), step=100.0,
+                    key="pension_objetivo"
+                )
+
+            with col2:
+                incognita = st.selectbox(
+                    "Calcular",
+                    list(INCOGNITAS),
+                    format_func=lambda k: INCOGNITAS[k],
+                    help="Parámetro que se despeja; el resto se mantiene como está arriba",
+                    key="incognita_meta"
+                )
+
+            capital_objetivo = float(capital_neto_objetivo(pension_objetivo, tea_retiro, anios_retiro))
+
+            if incognita == 'aporte':
+                valor = resolver_aporte(capital_objetivo, monto_inicial, frecuencia, plazo_anios,
+                                        tea_cartera, tasa_impuesto)
+                texto = f"Aporte {frecuencia.lower()} requerido: **{formato_moneda(valor)}**"
+            elif incognita == 'monto_inicial':
+                valor = resolver_monto_inicial(capital_objetivo, aporte_periodico, frecuencia, plazo_anios,
+                                               tea_cartera, tasa_impuesto)
+                texto = f"Monto inicial requerido: **{formato_moneda(valor)}**"
+            elif incognita == 'tea':
+                valor = resolver_tea(capital_objetivo, monto_inicial, aporte_periodico, frecuencia,
+                                     plazo_anios, tasa_impuesto)
+                texto = f"TEA de acumulación requerida: **{valor:.2f}%**"
+            else:
+                valor = resolver_edad_retiro(capital_objetivo, edad_actual, monto_inicial, aporte_periodico,
+                                             frecuencia, tea_cartera, tasa_impuesto)
+                texto = f"Edad de retiro requerida: **{valor:.0f} años**"
+
+            st.metric("Capital Neto Necesario", formato_moneda(capital_objetivo))
+            if np.isnan(valor):
+                st.warning("⚠️ La meta no es alcanzable dentro de los límites del cálculo.")
+            else:
+                st.success(texto)
+
+    # Resumen exportable del retiro
+    resumen_retiro = [
+        ('Edad de Retiro', edad_retiro),
+        ('Capital Total', capital_acumulado),
+        ('Ganancia', ganancia_total),
+        ('Tasa de Impuesto', tasa_impuesto),
+        ('Impuesto', impuesto),
+        ('Capital Neto', capital_neto)
+    ]
+    if tipo_retiro == 'Pensión Mensual':
+        resumen_retiro += [('TEA Retiro (%)', tea_retiro), ('Años de Retiro', anios_retiro),
+                           ('Pensión Mensual', pension_mensual)]
+    df_resumen = pd.DataFrame(resumen_retiro, columns=['Concepto', 'Valor'])
+    registrar_hoja('Retiro', df_resumen)
+
+    st.divider()
+    col1, col2 = st.columns(2)
+
+    with col1:
+        boton_descarga(df_resumen, "resumen_retiro", "📥 Descargar Resumen", clave="descarga_retiro")
+
+    with col2:
+        boton_libro_excel(clave="libro_mod_b")
+
     # Comparación de escenarios
     st.divider()
     st.subheader("🔄 Comparación de Escenarios")
@@ -139,30 +275,18 @@ def show_mod_b_form():
         if anios <= 0:
             return None
         
-        total_per = anios * num_periodos
-        s = monto_inicial
-        ap = monto_inicial
-        
-        for i in range(1, total_per + 1):
-            s = s + s * tasa_periodica + aporte_periodico
-            ap += aporte_periodico
-        
-        gan = s - ap
-        imp = gan * tasa_impuesto
-        cap_net = s - imp
-        
         if tipo_retiro == 'Pensión Mensual':
-            tm = convertir_tea_a_periodica(tea_retiro, 'Mensual')
-            mr = anios_retiro * 12
-            pens = cap_net * tm / (1 - (1 + tm) ** -mr)
+            escenario = proyectar_retiro(monto_inicial, aporte_periodico, frecuencia, anios, tea_cartera,
+                                         tasa_impuesto, tea_retiro, anios_retiro)
         else:
-            pens = 0
+            escenario = proyectar_retiro(monto_inicial, aporte_periodico, frecuencia, anios, tea_cartera,
+                                         tasa_impuesto)
         
         return {
             'edad': edad_ret,
-            'capital': s,
-            'neto': cap_net,
-            'pension': pens
+            'capital': escenario['saldo_final'],
+            'neto': escenario['capital_neto'],
+            'pension': escenario['pension_mensual']
         }
     
     esc1 = calcular_escenario(edad_comp_1)
@@ -1,4 +1,8 @@
-from utils.utils import convertir_tea_a_periodica, formato_moneda, mostrar_ayuda
+from utils.utils import convertir_tea_a_periodica, formato_moneda, columna_moneda, mostrar_ayuda
+from calculos.bonos import calcular_valoracion_bono, valorar_universo, rendimiento_al_vencimiento
+from calculos.cartera import agregar_cartera, optimizar_asignacion
+from calculos.cache import CacheLRU
+from ui.components.descargas import boton_descarga, boton_libro_excel, registrar_hoja
 from ui.results.res_mod_c import (
     mostrar_resultados_completos,
     comparacion_escenarios,
@@ -12,15 +16,112 @@ from reportlab.lib.pagesizes import letter
 from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Flowable
 from reportlab.lib.enums import TA_CENTER, TA_LEFT
 import io
 
+# Reportes PDF ya generados, por parámetros de valoración
+CACHE_REPORTES = CacheLRU(max_entradas=64, max_bytes=64 * 1024 * 1024)
+
+ENCABEZADO_FLUJOS_PDF = ['Período', 'Año', 'Flujo de Caja', 'Valor Presente']
+
+ESTILO_FLUJOS_PDF = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#f59e0b')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 11),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.grey),
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 1), (-1, -1), 9),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
+])
+
+
+class BloqueFlujosPDF(Flowable):
+    """Filas de la tabla de flujos de `inicio` a `fin`, maquetadas página por página
+
+    Al partirse arma solo la Table de la página actual (encabezado más las filas que caben en
+    el alto disponible) y deja el resto como otro bloque perezoso, así cada página lleva un
+    único encabezado y nunca hay más de una página de filas en memoria.
+    """
+
+    ANCHOS_COLUMNAS = [1 * inch, 1 * inch, 1.5 * inch, 1.5 * inch]
+
+    # Menos filas que esto al pie de una página pasan completas a la siguiente
+    MIN_FILAS_POR_PAGINA = 3
+
+    def __init__(self, columnas, inicio, fin, truncada=False):
+        super().__init__()
+        self.columnas = columnas
+        self.inicio = inicio
+        self.fin = fin
+        self.truncada = truncada
+        self._alturas = None
+        self._espacio = None
+
+    def _tabla(self, inicio, fin, truncada):
+        periodos, anios, flujos, valores = (c[inicio:fin].tolist() for c in self.columnas)
+        datos = [ENCABEZADO_FLUJOS_PDF]
+        datos.extend(
+            [str(int(p)), f"{a:.2f}", formato_moneda(f), formato_moneda(v)]
+            for p, a, f, v in zip(periodos, anios, flujos, valores)
+        )
+        if truncada:
+            datos.append(['...', '...', '...', '...'])
+
+        tabla = Table(datos, colWidths=self.ANCHOS_COLUMNAS)
+        tabla.setStyle(ESTILO_FLUJOS_PDF)
+        return tabla
+
+    def _alto_encabezado_y_fila(self, ancho):
+        # Todas las filas de datos tienen una sola línea: se miden una vez sobre una tabla de muestra
+        if self._alturas is None:
+            muestra = self._tabla(self.inicio, self.inicio + 1, False)
+            muestra.wrap(ancho, 1e6)
+            self._alturas = muestra._rowHeights[0], muestra._rowHeights[1]
+        return self._alturas
+
+    def _filas(self):
+        return self.fin - self.inicio + (1 if self.truncada else 0)
+
+    def wrap(self, ancho, alto):
+        self._espacio = (ancho, alto)
+        alto_encabezado, alto_fila = self._alto_encabezado_y_fila(ancho)
+        return sum(self.ANCHOS_COLUMNAS), alto_encabezado + self._filas() * alto_fila
+
+    def split(self, ancho, alto):
+        alto_encabezado, alto_fila = self._alto_encabezado_y_fila(ancho)
+        caben = int((alto - alto_encabezado) / alto_fila + 1e-6)
+        if caben < min(self.MIN_FILAS_POR_PAGINA, self._filas()):
+            return []
+        if caben >= self._filas():
+            return [self._tabla(self.inicio, self.fin, self.truncada)]
+
+        # La fila '...' de una tabla truncada viaja con la última fila de datos
+        corte = self.inicio + min(caben, self.fin - self.inicio - 1)
+        if corte <= self.inicio:
+            return []
+        return [
+            self._tabla(self.inicio, corte, False),
+            BloqueFlujosPDF(self.columnas, corte, self.fin, self.truncada)
+        ]
+
+    def drawOn(self, canvas, x, y, _sW=0):
+        tabla = self._tabla(self.inicio, self.fin, self.truncada)
+        tabla.wrap(*self._espacio)
+        tabla.drawOn(canvas, x, y, _sW)
+
 
 def generar_pdf_bonos(valor_nominal, tasa_cupon, frecuencia_bono, plazo_bono,
                       tea_bono, df_flujos, valor_presente_total, cupon,
-                      tasa_cupon_periodica, tasa_descuento_periodica):
-    """Genera un PDF profesional con el reporte de valoración del bono"""
+                      tasa_cupon_periodica, tasa_descuento_periodica, filas_detalle=20):
+    """Genera un PDF profesional con el reporte de valoración del bono
+
+    Con `filas_detalle=None` se incluye el cronograma completo, paginado.
+    """
 
     buffer = io.BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=letter, topMargin=0.5 * inch, bottomMargin=0.5 * inch)
@@ -57,7 +158,7 @@ def generar_pdf_bonos(valor_nominal, tasa_cupon, frecuencia_bono, plazo_bono,
 
     # Título principal
     story.append(Paragraph("REPORTE DE VALORACIÓN DE BONOS", title_style))
-    story.append(Paragraph(f"Fecha de emisión: {datetime.now().strftime('%d/%m/%Y %H:%M')}", normal_style))
+    story.append(Paragraph(f"Fecha de emisión: {datetime.now().strftime('%d/%m/%Y')}", normal_style))
     story.append(Spacer(1, 0.3 * inch))
 
     # Sección 1: Parámetros del Bono
@@ -150,38 +251,15 @@ def generar_pdf_bonos(valor_nominal, tasa_cupon, frecuencia_bono, plazo_bono,
     # Sección 3: Detalle de Flujos
     story.append(Paragraph("3. DETALLE DE FLUJOS DE CAJA", subtitle_style))
 
-    flujos_data = [['Período', 'Año', 'Flujo de Caja', 'Valor Presente']]
-
-    for _, row in df_flujos.head(20).iterrows():
-        flujos_data.append([
-            str(int(row['Periodo'])),
-            f"{row['Año']:.2f}",
-            formato_moneda(row['Flujo']),
-            formato_moneda(row['Valor Presente'])
-        ])
-
-    if len(df_flujos) > 20:
-        flujos_data.append(['...', '...', '...', '...'])
-
-    tabla_flujos = Table(flujos_data, colWidths=[1 * inch, 1 * inch, 1.5 * inch, 1.5 * inch])
-    tabla_flujos.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#f59e0b')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 11),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 1), (-1, -1), 9),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
-    ]))
+    total_filas = len(df_flujos)
+    filas_tabla = total_filas if filas_detalle is None else min(filas_detalle, total_filas)
+    columnas = [df_flujos[c].to_numpy() for c in ('Periodo', 'Año', 'Flujo', 'Valor Presente')]
 
-    story.append(tabla_flujos)
+    # La tabla se arma página por página al maquetarse, con un encabezado por página
+    story.append(BloqueFlujosPDF(columnas, 0, filas_tabla, filas_tabla < total_filas))
 
-    if len(df_flujos) > 20:
-        nota = Paragraph(f"<i>Nota: Se muestran los primeros 20 períodos de {len(df_flujos)} totales.</i>",
+    if filas_tabla < total_filas:
+        nota = Paragraph(f"<i>Nota: Se muestran los primeros {filas_tabla} períodos de {total_filas} totales.</i>",
                          normal_style)
         story.append(Spacer(1, 0.1 * inch))
         story.append(nota)
@@ -201,54 +279,6 @@ def generar_pdf_bonos(valor_nominal, tasa_cupon, frecuencia_bono, plazo_bono,
     return buffer
 
 
-def calcular_valoracion_bono(valor_nominal, tasa_cupon, frecuencia_bono, plazo_bono, tea_bono):
-    """Función para calcular la valoración del bono"""
-    periodos_bono = {
-        'Mensual': 12, 'Bimestral': 6, 'Trimestral': 4,
-        'Cuatrimestral': 3, 'Semestral': 2, 'Anual': 1
-    }
-
-    num_periodos_bono = periodos_bono[frecuencia_bono]
-    total_periodos_bono = plazo_bono * num_periodos_bono
-
-    tasa_cupon_periodica = convertir_tea_a_periodica(tasa_cupon, frecuencia_bono)
-    tasa_descuento_periodica = convertir_tea_a_periodica(tea_bono, frecuencia_bono)
-
-    cupon = valor_nominal * tasa_cupon_periodica
-
-    # Calcular flujos y valor presente
-    flujos = []
-    valor_presente_total = 0
-
-    for i in range(1, total_periodos_bono + 1):
-        if i == total_periodos_bono:
-            flujo = cupon + valor_nominal
-        else:
-            flujo = cupon
-
-        vp = flujo / ((1 + tasa_descuento_periodica) ** i)
-        valor_presente_total += vp
-
-        flujos.append({
-            'Periodo': i,
-            'Año': round(i / num_periodos_bono, 2),
-            'Flujo': flujo,
-            'Valor Presente': vp
-        })
-
-    df_flujos = pd.DataFrame(flujos)
-
-    return {
-        'df_flujos': df_flujos,
-        'valor_presente_total': valor_presente_total,
-        'cupon': cupon,
-        'tasa_cupon_periodica': tasa_cupon_periodica,
-        'tasa_descuento_periodica': tasa_descuento_periodica,
-        'num_periodos_bono': num_periodos_bono,
-        'total_periodos_bono': total_periodos_bono
-    }
-
-
 def show_mod_c_form():
     st.header("📊 Módulo C: Valoración de Bonos")
     st.markdown("Calcula el valor presente de un bono según sus características y pagos periódicos.")
@@ -347,20 +377,20 @@ def show_mod_c_form():
             }
         )
         
-        # Calcular valoraciones
-        resultados_ejemplo = []
-        for bono in bonos_ejemplo:
-            resultado = calcular_valoracion_bono(
-                valor_nominal=bono['Valor Nominal'],
-                tasa_cupon=bono['Tasa Cupón'],
-                frecuencia_bono=bono['Frecuencia'],
-                plazo_bono=bono['Años'],
-                tea_bono=bono['Rendimiento Requerido']
-            )
-            resultado['emisor'] = bono['Emisor']
-            resultado['valor_nominal'] = bono['Valor Nominal']
-            resultado['rendimiento'] = bono['Rendimiento Requerido']
-            resultados_ejemplo.append(resultado)
+        # Calcular valoraciones (todo el universo en una sola llamada)
+        df_bonos = pd.DataFrame(bonos_ejemplo)
+        df_universo = df_bonos.join(valorar_universo(df_bonos))
+        resultados_ejemplo = [
+            {
+                'emisor': b['Emisor'],
+                'valor_nominal': b['Valor Nominal'],
+                'rendimiento': b['Rendimiento Requerido'],
+                'valor_presente_total': b['Valor Presente'],
+                'cupon': b['Cupón'],
+                'num_periodos_bono': b['Periodos por Año']
+            }
+            for b in df_universo.to_dict('records')
+        ]
         
         # Análisis comparativo
         st.divider()
@@ -369,20 +399,21 @@ def show_mod_c_form():
         col_analisis1, col_analisis2 = st.columns([2, 1])
         
         with col_analisis1:
-            df_valoracion = pd.DataFrame([
-                {
-                    'Empresa': r['emisor'],
-                    'VP': formato_moneda(r['valor_presente_total']),
-                    'VN': formato_moneda(r['valor_nominal']),
-                    'Diferencia': formato_moneda(r['valor_presente_total'] - r['valor_nominal']),
-                    'Tipo': 'Prima' if r['valor_presente_total'] > r['valor_nominal'] 
-                           else 'Descuento' if r['valor_presente_total'] < r['valor_nominal'] 
-                           else 'Par',
-                    '% sobre VN': f"{((r['valor_presente_total'] / r['valor_nominal'] - 1) * 100):.2f}%"
+            df_valoracion = df_universo[['Emisor', 'Valor Presente', 'Valor Nominal', 'Diferencia', 'Tipo', '% sobre VN']]
+            st.dataframe(
+                df_valoracion,
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    "Emisor": "Empresa",
+                    "Valor Presente": columna_moneda("VP"),
+                    "Valor Nominal": columna_moneda("VN"),
+                    "Diferencia": columna_moneda("Diferencia"),
+                    "% sobre VN": st.column_config.NumberColumn("% sobre VN", format="%.2f%%")
                 }
-                for r in resultados_ejemplo
-            ])
-            st.dataframe(df_valoracion, use_container_width=True, hide_index=True)
+            )
+            boton_descarga(df_universo, "valoracion_universo", "📥 Descargar Valoración",
+                           clave="descarga_universo")
         
         with col_analisis2:
             # Gráfico de comparación
@@ -444,21 +475,106 @@ def show_mod_c_form():
                         f"{formato_moneda(r['valor_presente_total'])} ({porcentaje:+.2f}%)")
         
         with col_ranking2:
-            mejor_bono = resultados_ordenados[0]
-            cantidad_bonos = int(presupuesto_total / mejor_bono['valor_presente_total'])
-            inversion_total = cantidad_bonos * mejor_bono['valor_presente_total']
-            cupon_total_anual = cantidad_bonos * mejor_bono['cupon'] * mejor_bono['num_periodos_bono']
-            
-            st.info(f"""
-            **Mejor opción: {mejor_bono['emisor']}**
-            
-            Con tu presupuesto de {formato_moneda(presupuesto_total)}:
-            - Puedes comprar: **{cantidad_bonos} bonos**
-            - Inversión total: {formato_moneda(inversion_total)}
-            - Ingreso anual por cupones: {formato_moneda(cupon_total_anual)}
-            - Cupón por período: {formato_moneda(mejor_bono['cupon'])} ({mejor_bono['num_periodos_bono']}x al año)
-            """)
-    
+            col_obj, col_conc, col_dur = st.columns(3)
+
+            with col_obj:
+                objetivo = st.selectbox("Objetivo", ['Rendimiento', 'Ingreso por cupones'], key="objetivo_asignacion")
+
+            with col_conc:
+                concentracion_max = st.number_input("Máximo por bono (%)", 1.0, 100.0, 50.0, 5.0,
+                                                    key="concentracion_asignacion")
+
+            with col_dur:
+                duracion_max = st.number_input("Duración máxima", 0.5, 50.0, 6.0, 0.5,
+                                               help="Duración modificada promedio de la cartera",
+                                               key="duracion_asignacion")
+
+            asignacion = optimizar_asignacion(
+                df_bonos, presupuesto_total,
+                objetivo='cupones' if objetivo == 'Ingreso por cupones' else 'rendimiento',
+                concentracion_max=concentracion_max / 100, duracion_max=duracion_max,
+                valoracion=df_universo
+            )
+            compras = asignacion['asignacion'].join(df_bonos['Emisor'])
+            compras = compras[compras['Cantidad'] > 0]
+
+            lineas = [
+                f"**Asignación óptima ({objetivo.lower()})**",
+                "",
+                f"Con tu presupuesto de {formato_moneda(presupuesto_total)}:"
+            ]
+            lineas.extend(
+                f"- {c['Emisor']}: **{c['Cantidad']} bonos** ({formato_moneda(c['Inversión'])})"
+                for c in compras.to_dict('records')
+            )
+            if compras.empty:
+                lineas.append("- Ningún bono cumple las restricciones")
+            lineas.extend([
+                f"- Inversión total: {formato_moneda(asignacion['inversion_total'])} "
+                f"(sobrante {formato_moneda(asignacion['remanente'])})",
+                f"- Ingreso anual por cupones: {formato_moneda(asignacion['cupon_anual'])}",
+                f"- Rendimiento promedio: {asignacion['rendimiento_promedio']:.2f}% · "
+                f"Duración: {asignacion['duracion_modificada']:.2f}"
+            ])
+            st.info("\n".join(lineas))
+
+        # Cartera con varias posiciones
+        st.divider()
+        st.markdown("**🧺 Cartera de Bonos:**")
+        st.caption("Define cuántos bonos de cada emisor mantienes; los flujos de todas las posiciones "
+                   "se agregan en una escalera mensual común.")
+
+        df_posiciones = st.data_editor(
+            df_bonos.assign(Cantidad=100),
+            use_container_width=True,
+            hide_index=True,
+            num_rows="dynamic",
+            key="cartera_bonos",
+            column_config={
+                "Frecuencia": st.column_config.SelectboxColumn(
+                    "Frecuencia", options=['Mensual', 'Bimestral', 'Trimestral', 'Cuatrimestral', 'Semestral', 'Anual'],
+                    required=True
+                ),
+                "Años": st.column_config.NumberColumn("Años", min_value=1, max_value=50, step=1, required=True),
+                "Valor Nominal": st.column_config.NumberColumn("Valor Nominal", min_value=1.0, required=True),
+                "Tasa Cupón": st.column_config.NumberColumn("Tasa Cupón", min_value=0.0, required=True),
+                "Rendimiento Requerido": st.column_config.NumberColumn("Rend. Req.", min_value=0.0, required=True),
+                "Cantidad": st.column_config.NumberColumn("Cantidad", min_value=0, step=1, required=True)
+            }
+        ).dropna(subset=['Valor Nominal', 'Tasa Cupón', 'Frecuencia', 'Años', 'Rendimiento Requerido', 'Cantidad'])
+
+        if len(df_posiciones):
+            cartera = agregar_cartera(df_posiciones)
+
+            col1, col2, col3, col4 = st.columns(4)
+
+            with col1:
+                st.metric("Valor Presente Cartera", formato_moneda(cartera['valor_presente_total']))
+
+            with col2:
+                st.metric("Ingreso Anual por Cupones", formato_moneda(cartera['cupon_anual']))
+
+            with col3:
+                st.metric("Duración Modificada", f"{cartera['duracion_modificada']:.2f}")
+
+            with col4:
+                st.metric("DV01 Cartera", formato_moneda(cartera['dv01']))
+
+            ingresos = cartera['ingresos_anuales']
+            fig_ingresos = go.Figure(data=[
+                go.Bar(x=ingresos['Año'], y=ingresos['Cupones'], name='Cupones', marker_color='#10B981'),
+                go.Bar(x=ingresos['Año'], y=ingresos['Amortización'], name='Amortización', marker_color='#3B82F6')
+            ])
+            fig_ingresos.update_layout(
+                title='Ingresos de la Cartera por Año',
+                xaxis_title='Año',
+                yaxis_title='Flujo (S/)',
+                barmode='stack',
+                height=350,
+                template='plotly_white'
+            )
+            st.plotly_chart(fig_ingresos, use_container_width=True)
+
     # SECCIÓN PRINCIPAL: VALORACIÓN INDIVIDUAL
     st.divider()
     st.subheader("⚙️ Valoración Individual de Bono")
@@ -557,17 +673,52 @@ def show_mod_c_form():
         valor_nominal, tasa_cupon, frecuencia_bono, plazo_bono,
         tea_bono, resultados['df_flujos'], resultados['valor_presente_total'],
         resultados['cupon'], resultados['tasa_cupon_periodica'],
-        resultados['tasa_descuento_periodica'], resultados['num_periodos_bono']
+        resultados['tasa_descuento_periodica'], resultados['num_periodos_bono'],
+        riesgo=resultados
     )
 
     # SECCIÓN 4: ANÁLISIS DE SENSIBILIDAD
     st.divider()
     st.subheader("📈 Análisis de Sensibilidad")
     
+    col_sens1, col_sens2, col_sens3 = st.columns(3)
+
+    with col_sens1:
+        tasa_min_sens = st.number_input(
+            "Tasa mínima (%)",
+            min_value=0.0, max_value=49.0, value=1.0, step=0.5,
+            key="tasa_min_sens"
+        )
+
+    with col_sens2:
+        tasa_max_sens = st.number_input(
+            "Tasa máxima (%)",
+            min_value=tasa_min_sens + 0.5, max_value=50.0, value=max(20.0, tasa_min_sens + 0.5), step=0.5,
+            key="tasa_max_sens"
+        )
+
+    with col_sens3:
+        puntos_sens = st.number_input(
+            "Puntos de la curva",
+            min_value=10, max_value=5000, value=39, step=10,
+            help="Resolución de la curva precio/tasa",
+            key="puntos_sens"
+        )
+
+    sens_exacta = st.checkbox(
+        "Revaluación exacta",
+        value=True,
+        help="Revalúa el bono en cada tasa; si no, la curva se aproxima con duración y convexidad "
+             "solo en un punto porcentual alrededor de la tasa actual",
+        key="sens_exacta"
+    )
+
     # Gráfico de sensibilidad
     fig_sens = grafico_sensibilidad(
         valor_nominal, resultados['cupon'], resultados['total_periodos_bono'],
-        frecuencia_bono, tea_bono, convertir_tea_a_periodica
+        frecuencia_bono, tea_bono, convertir_tea_a_periodica,
+        tasa_min_sens, tasa_max_sens, puntos_sens,
+        resultados=resultados, exacta=sens_exacta
     )
     st.plotly_chart(fig_sens, use_container_width=True)
 
@@ -602,38 +753,75 @@ def show_mod_c_form():
             frecuencia_bono, convertir_tea_a_periodica
         )
 
+    # Rendimiento implícito en un precio de mercado
+    with st.expander("🔁 Rendimiento al Vencimiento desde el Precio de Mercado", expanded=False):
+        precio_mercado = st.number_input(
+            "Precio de Mercado (USD)",
+            min_value=0.01, value=float(round(resultados['valor_presente_total'], 2)), step=10.0,
+            help="Precio al que cotiza el bono; se calcula la TEA que lo iguala al valor presente de sus flujos",
+            key="precio_mercado"
+        )
+
+        ytm = rendimiento_al_vencimiento(precio_mercado, valor_nominal, tasa_cupon, frecuencia_bono, plazo_bono)
+
+        col_ytm1, col_ytm2 = st.columns(2)
+
+        with col_ytm1:
+            if pd.isna(ytm):
+                st.warning("⚠️ No se encontró un rendimiento que iguale ese precio; revisa el precio de mercado.")
+            else:
+                st.metric("📈 Rendimiento al Vencimiento (TEA)", f"{ytm:.4f}%",
+                          delta=f"{ytm - tea_bono:+.4f} pp vs tasa esperada", delta_color="off")
+
+        with col_ytm2:
+            st.metric("💰 Tasa Cupón (TEA)", f"{tasa_cupon:.2f}%")
+
     # SECCIÓN 6: EXPORTACIÓN
     st.divider()
 
     col_btn1, col_btn2 = st.columns(2)
 
     with col_btn1:
-        # Descarga CSV
-        csv = resultados['df_flujos'].to_csv(index=False).encode('utf-8')
-        st.download_button(
-            label="📥 Descargar Flujos (CSV)",
-            data=csv,
-            file_name=f"valoracion_bono_{datetime.now().strftime('%Y%m%d')}.csv",
-            mime="text/csv",
-            use_container_width=True
-        )
+        # Descarga de flujos (CSV, Parquet o Arrow IPC)
+        boton_descarga(resultados['df_flujos'], "valoracion_bono", "📥 Descargar Flujos",
+                       clave="descarga_flujos", use_container_width=True)
+        registrar_hoja('Flujos Bono', resultados['df_flujos'])
+        boton_libro_excel(clave="libro_mod_c", use_container_width=True)
 
     with col_btn2:
-        # Descarga PDF
-        try:
-            pdf_buffer = generar_pdf_bonos(
-                valor_nominal, tasa_cupon, frecuencia_bono, plazo_bono,
-                tea_bono, resultados['df_flujos'], resultados['valor_presente_total'],
-                resultados['cupon'], resultados['tasa_cupon_periodica'],
-                resultados['tasa_descuento_periodica']
-            )
+        # Descarga PDF: solo se genera cuando el usuario lo pide
+        pdf_completo = st.checkbox(
+            "Incluir cronograma completo en el PDF",
+            help="Agrega todos los períodos paginados en lugar de los primeros 20"
+        )
+        # La fecha de emisión impresa forma parte de la clave: un reporte no se sirve otro día
+        clave_pdf = (float(valor_nominal), float(tasa_cupon), frecuencia_bono, int(plazo_bono), float(tea_bono),
+                     pdf_completo, datetime.now().strftime('%Y-%m-%d'))
+        pdf_solicitado = st.session_state.get('pdf_bono_clave') == clave_pdf
+
+        if not pdf_solicitado and st.button("📄 Generar Reporte (PDF)", use_container_width=True):
+            st.session_state['pdf_bono_clave'] = clave_pdf
+            pdf_solicitado = True
+
+        if pdf_solicitado:
+            try:
+                pdf_bytes = CACHE_REPORTES.obtener(
+                    clave_pdf,
+                    lambda: generar_pdf_bonos(
+                        valor_nominal, tasa_cupon, frecuencia_bono, plazo_bono,
+                        tea_bono, resultados['df_flujos'], resultados['valor_presente_total'],
+                        resultados['cupon'], resultados['tasa_cupon_periodica'],
+                        resultados['tasa_descuento_periodica'],
+                        filas_detalle=None if pdf_completo else 20
+                    ).getvalue()
+                )
 
-            st.download_button(
-                label="📄 Descargar Reporte (PDF)",
-                data=pdf_buffer,
-                file_name=f"reporte_bono_{datetime.now().strftime('%Y%m%d')}.pdf",
-                mime="application/pdf",
-                use_container_width=True
-            )
-        except Exception as e:
-            st.error(f"Error al generar PDF: {str(e)}")
\ No newline at end of file
+                st.download_button(
+                    label="📄 Descargar Reporte (PDF)",
+                    data=pdf_bytes,
+                    file_name=f"reporte_bono_{datetime.now().strftime('%Y%m%d')}.pdf",
+                    mime="application/pdf",
+                    use_container_width=True
+                )
+            except Exception as e:
+                st.error(f"Error al generar PDF: {str(e)}")
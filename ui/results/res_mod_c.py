@@ -1,8 +1,13 @@
 import streamlit as st
-import plotly.graph_objects as go
+import numpy as np
 import pandas as pd
 from datetime import datetime
-from utils.utils import formato_moneda
+from utils.utils import formato_moneda, columna_moneda
+from calculos.bonos import curva_sensibilidad, curva_taylor, valores_presentes_a_tasas
+from ui.components.figuras import MAX_PUNTOS_GRAFICO, figura_flujos, figura_vp_acumulado, figura_sensibilidad
+
+# Puntos de TEA a cada lado de la tasa actual en los que se dibuja la aproximación de Taylor
+BANDA_TAYLOR = 1.0
 
 
 def mostrar_metricas_bono(valor_presente_total, valor_nominal, cupon):
@@ -32,6 +37,27 @@ def mostrar_metricas_bono(valor_presente_total, valor_nominal, cupon):
         st.metric("Tipo de Bono", tipo, delta=formato_moneda(diferencia))
 
 
+def mostrar_riesgo_bono(duracion_macaulay, duracion_modificada, convexidad, dv01):
+    """Muestra las medidas de riesgo de tasa del bono"""
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
+        st.metric("⏱️ Duración Macaulay", f"{duracion_macaulay:.2f} años",
+                  help="Plazo promedio ponderado de los flujos descontados")
+
+    with col2:
+        st.metric("📐 Duración Modificada", f"{duracion_modificada:.2f}",
+                  help="Variación porcentual aproximada del precio ante +1 punto de TEA")
+
+    with col3:
+        st.metric("〰️ Convexidad", f"{convexidad:.2f}",
+                  help="Curvatura de la relación precio/tasa")
+
+    with col4:
+        st.metric("💲 DV01", formato_moneda(dv01),
+                  help="Cambio en el valor del bono ante un movimiento de 1 punto básico en la TEA")
+
+
 def mostrar_interpretacion(valor_presente_total, valor_nominal, tea_bono, tasa_cupon):
     """Muestra la interpretación del resultado de valoración"""
     diferencia = abs(valor_presente_total - valor_nominal)
@@ -50,91 +76,33 @@ def mostrar_interpretacion(valor_presente_total, valor_nominal, tea_bono, tasa_c
         st.info("💡 **Razón:** La tasa cupón y la tasa de descuento son iguales.")
 
 
-def grafico_flujos(df_flujos):
+def grafico_flujos(df_flujos, max_puntos=MAX_PUNTOS_GRAFICO):
     """Genera el gráfico de flujos de caja vs valor presente"""
-    fig = go.Figure()
-
-    fig.add_trace(go.Bar(
-        x=df_flujos['Año'],
-        y=df_flujos['Flujo'],
-        name='Flujo de Caja',
-        marker_color='#3B82F6',
-        hovertemplate='Año: %{x:.2f}<br>Flujo: $%{y:,.2f}<extra></extra>'
-    ))
-
-    fig.add_trace(go.Bar(
-        x=df_flujos['Año'],
-        y=df_flujos['Valor Presente'],
-        name='Valor Presente',
-        marker_color='#10B981',
-        hovertemplate='Año: %{x:.2f}<br>VP: $%{y:,.2f}<extra></extra>'
-    ))
-
-    fig.update_layout(
-        xaxis_title="Año",
-        yaxis_title="Valor (USD)",
-        barmode='group',
-        height=400,
-        template='plotly_white',
-        hovermode='x unified'
+    return figura_flujos(
+        df_flujos['Año'].to_numpy(), df_flujos['Flujo'].to_numpy(), df_flujos['Valor Presente'].to_numpy(),
+        max_puntos
     )
 
-    return fig
-
 
-def grafico_vp_acumulado(df_flujos, valor_nominal):
+def grafico_vp_acumulado(df_flujos, valor_nominal, max_puntos=MAX_PUNTOS_GRAFICO):
     """Genera el gráfico de valor presente acumulado"""
-    df_flujos_copy = df_flujos.copy()
-    df_flujos_copy['VP Acumulado'] = df_flujos_copy['Valor Presente'].cumsum()
-
-    fig = go.Figure()
-
-    fig.add_trace(go.Scatter(
-        x=df_flujos_copy['Año'],
-        y=df_flujos_copy['VP Acumulado'],
-        mode='lines+markers',
-        name='VP Acumulado',
-        line=dict(color='#8b5cf6', width=3),
-        marker=dict(size=6),
-        fill='tozeroy',
-        fillcolor='rgba(139, 92, 246, 0.2)',
-        hovertemplate='Año: %{x:.2f}<br>VP Acumulado: $%{y:,.2f}<extra></extra>'
-    ))
-
-    fig.add_hline(
-        y=valor_nominal,
-        line_dash="dash",
-        line_color="red",
-        annotation_text=f"Valor Nominal: {formato_moneda(valor_nominal)}",
-        annotation_position="right"
+    return figura_vp_acumulado(
+        df_flujos['Año'].to_numpy(), np.cumsum(df_flujos['Valor Presente'].to_numpy()), valor_nominal,
+        max_puntos
     )
 
-    fig.update_layout(
-        xaxis_title="Año",
-        yaxis_title="Valor Presente Acumulado (USD)",
-        height=400,
-        template='plotly_white',
-        hovermode='x'
-    )
-
-    return fig
-
 
 def tabla_flujos(df_flujos):
     """Muestra la tabla de flujos formateada"""
-    df_mostrar = df_flujos.copy()
-    df_mostrar['Flujo'] = df_mostrar['Flujo'].apply(formato_moneda)
-    df_mostrar['Valor Presente'] = df_mostrar['Valor Presente'].apply(formato_moneda)
-
     st.dataframe(
-        df_mostrar,
+        df_flujos,
         use_container_width=True,
         hide_index=True,
         column_config={
             "Periodo": st.column_config.NumberColumn("Período", format="%d"),
             "Año": st.column_config.NumberColumn("Año", format="%.2f"),
-            "Flujo": "Flujo de Caja",
-            "Valor Presente": "Valor Presente"
+            "Flujo": columna_moneda("Flujo de Caja"),
+            "Valor Presente": columna_moneda("Valor Presente")
         }
     )
 
@@ -143,30 +111,11 @@ def comparacion_escenarios(tasa_escenario1, tasa_escenario2, tea_bono,
                            valor_nominal, cupon, total_periodos_bono,
                            frecuencia_bono, convertir_tea_a_periodica):
     """Muestra la comparación de escenarios con diferentes tasas de forma visual"""
-    from utils.utils import convertir_tea_a_periodica
-
-    # Calcular escenarios
-    tasa_esc1_periodica = convertir_tea_a_periodica(tasa_escenario1, frecuencia_bono)
-    tasa_esc2_periodica = convertir_tea_a_periodica(tasa_escenario2, frecuencia_bono)
-    tasa_actual_periodica = convertir_tea_a_periodica(tea_bono, frecuencia_bono)
-
-    vp_esc1 = sum([
-        (cupon if i < total_periodos_bono else cupon + valor_nominal) /
-        ((1 + tasa_esc1_periodica) ** i)
-        for i in range(1, total_periodos_bono + 1)
-    ])
-
-    vp_esc2 = sum([
-        (cupon if i < total_periodos_bono else cupon + valor_nominal) /
-        ((1 + tasa_esc2_periodica) ** i)
-        for i in range(1, total_periodos_bono + 1)
-    ])
-
-    vp_actual = sum([
-        (cupon if i < total_periodos_bono else cupon + valor_nominal) /
-        ((1 + tasa_actual_periodica) ** i)
-        for i in range(1, total_periodos_bono + 1)
-    ])
+    # Calcular escenarios con el mismo motor de curva (servidos desde la caché si ya se calcularon)
+    vp_esc1, vp_actual, vp_esc2 = valores_presentes_a_tasas(
+        valor_nominal, cupon, total_periodos_bono, frecuencia_bono,
+        [tasa_escenario1, tea_bono, tasa_escenario2]
+    )
 
     # Mostrar comparación en columnas
     st.markdown("### Comparación de Valores Presentes")
@@ -204,65 +153,36 @@ def comparacion_escenarios(tasa_escenario1, tasa_escenario2, tea_bono,
 
 
 def grafico_sensibilidad(valor_nominal, cupon, total_periodos_bono,
-                         frecuencia_bono, tea_bono, convertir_tea_a_periodica):
-    """Genera el gráfico de análisis de sensibilidad"""
-    from utils.utils import convertir_tea_a_periodica
-
-    # Gráfica de sensibilidad
-    tasas_rango = [i / 10 for i in range(10, 201, 5)]  # 1% a 20%
-    valores_sensibilidad = []
-
-    for tasa in tasas_rango:
-        tasa_per = convertir_tea_a_periodica(tasa, frecuencia_bono)
-        vp = sum([
-            (cupon if i < total_periodos_bono else cupon + valor_nominal) /
-            ((1 + tasa_per) ** i)
-            for i in range(1, total_periodos_bono + 1)
-        ])
-        valores_sensibilidad.append(vp)
-
-    fig = go.Figure()
-
-    fig.add_trace(go.Scatter(
-        x=tasas_rango,
-        y=valores_sensibilidad,
-        mode='lines',
-        name='Valor del Bono',
-        line=dict(color='#6366f1', width=3),
-        fill='tozeroy',
-        fillcolor='rgba(99, 102, 241, 0.2)'
-    ))
-
-    fig.add_hline(
-        y=valor_nominal,
-        line_dash="dash",
-        line_color="red",
-        annotation_text="Valor Nominal"
-    )
-
-    fig.add_vline(
-        x=tea_bono,
-        line_dash="dot",
-        line_color="green",
-        annotation_text="Tasa Actual"
-    )
+                         frecuencia_bono, tea_bono, convertir_tea_a_periodica,
+                         tasa_min=1.0, tasa_max=20.0, puntos=39, resultados=None, exacta=True):
+    """Genera el gráfico de análisis de sensibilidad
+
+    Con `resultados` de la valoración y `exacta=False` la curva se aproxima por duración y
+    convexidad, solo dentro de ±BANDA_TAYLOR puntos alrededor de `tea_bono` (fuera de esa
+    banda la parábola se aleja del precio real).
+    """
+    # Gráfica de sensibilidad (grilla de tasas configurable, por defecto 1% a 20% cada 0.5%)
+    if exacta or resultados is None:
+        tasas_rango, valores_sensibilidad = curva_sensibilidad(
+            valor_nominal, cupon, total_periodos_bono, frecuencia_bono,
+            tasa_min, tasa_max, puntos
+        )
+        return figura_sensibilidad(tasas_rango, valores_sensibilidad, valor_nominal, tea_bono)
 
-    fig.update_layout(
-        title="Análisis de Sensibilidad: Valor del Bono vs Tasa de Descuento",
-        xaxis_title="Tasa de Descuento (%)",
-        yaxis_title="Valor Presente (USD)",
-        height=400,
-        template='plotly_white'
+    tasas_rango = np.linspace(max(tasa_min, tea_bono - BANDA_TAYLOR), min(tasa_max, tea_bono + BANDA_TAYLOR), puntos)
+    valores_sensibilidad = curva_taylor(
+        resultados['valor_presente_total'], resultados['duracion_modificada'],
+        resultados['convexidad'], tea_bono, tasas_rango
     )
-
-    return fig
+    titulo = f"Aproximación por Duración y Convexidad (TEA ±{BANDA_TAYLOR:g} pp)"
+    return figura_sensibilidad(tasas_rango, valores_sensibilidad, valor_nominal, tea_bono, titulo=titulo)
 
 
 def mostrar_resultados_completos(valor_nominal, tasa_cupon, frecuencia_bono,
                                  plazo_bono, tea_bono, df_flujos,
                                  valor_presente_total, cupon,
                                  tasa_cupon_periodica, tasa_descuento_periodica,
-                                 num_periodos_bono):
+                                 num_periodos_bono, riesgo=None):
     """Función principal que muestra todos los resultados de forma concisa"""
     total_periodos_bono = plazo_bono * num_periodos_bono
 
@@ -270,6 +190,11 @@ def mostrar_resultados_completos(valor_nominal, tasa_cupon, frecuencia_bono,
     st.subheader("📊 Resultados de la Valoración")
     mostrar_metricas_bono(valor_presente_total, valor_nominal, cupon)
 
+    # Riesgo de tasa de interés
+    if riesgo is not None:
+        mostrar_riesgo_bono(riesgo['duracion_macaulay'], riesgo['duracion_modificada'],
+                            riesgo['convexidad'], riesgo['dv01'])
+
     # Interpretación
     st.divider()
     mostrar_interpretacion(valor_presente_total, valor_nominal, tea_bono, tasa_cupon)
@@ -296,6 +221,10 @@ def mostrar_resultados_completos(valor_nominal, tasa_cupon, frecuencia_bono,
     st.subheader("🔎 Análisis Visual")
     
     tab1, tab2, tab3 = st.tabs(["💵 Flujos de Caja", "📊 VP Acumulado", "📋 Tabla Detallada"])
+
+    if len(df_flujos) > MAX_PUNTOS_GRAFICO:
+        st.caption(f"Los gráficos muestran {MAX_PUNTOS_GRAFICO:,} de {len(df_flujos):,} períodos; "
+                   "la tabla y las descargas conservan el detalle completo.")
     
     with tab1:
         fig_flujos = grafico_flujos(df_flujos)
@@ -1,19 +1,16 @@
-import streamlit as st
+from calculos.tasas import convertir_tea_a_periodica
 
 # Funciones auxiliares
-def convertir_tea_a_periodica(tea, frecuencia):
-    """Convierte TEA a tasa periódica"""
-    periodos = {
-        'Mensual': 12, 'Bimestral': 6, 'Trimestral': 4,
-        'Cuatrimestral': 3, 'Semestral': 2, 'Anual': 1
-    }
-    n = periodos.get(frecuencia, 12)
-    return (1 + tea / 100) ** (1 / n) - 1
-
 def formato_moneda(valor):
     """Formatea valores en dólares"""
     return f"${valor:,.2f}"
 
+def columna_moneda(etiqueta, **kwargs):
+    """Columna numérica que el navegador muestra en dólares (la tabla sigue siendo ordenable)"""
+    import streamlit as st
+    return st.column_config.NumberColumn(etiqueta, format="dollar", **kwargs)
+
 def mostrar_ayuda(texto):
     """Muestra texto de ayuda"""
-    return st.markdown(f'<p class="help-text">💡 {texto}</p>', unsafe_allow_html=True)
\ No newline at end of file
+    import streamlit as st
+    return st.markdown(f'<p class="help-text">💡 {texto}</p>', unsafe_allow_html=True)